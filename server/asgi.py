@@ -0,0 +1,63 @@
+# Приложение создаётся фабрикой, модульного app нет:
+#   hypercorn "asgi:create_app()"
+#   uvicorn --factory asgi:create_app
+#   GUNICORN_APP="asgi:create_app()" GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn.conf.py
+import asyncio
+import re
+
+from dotenv import load_dotenv
+from quart import Quart, jsonify, send_from_directory
+from quart_cors import cors
+
+from app import preload
+from config import SECRET_KEY
+from database import ensure_indexes
+from services.password_service import PasswordHasherBusy
+from services.scheduler import shutdown_scheduler, start_scheduler
+
+from routes.asgi_user_routes import user_bp
+from routes.asgi_collection_routes import collection_bp
+from routes.asgi_ml_routes import ml_bp
+from routes.asgi_health_routes import health_bp
+
+
+def create_app(start_jobs=True):
+    load_dotenv()
+
+    app = Quart(__name__, static_folder="../frontend/dist", static_url_path="/")
+    app = cors(app, allow_origin=re.compile(r".*"), allow_credentials=True)
+    app.config["SECRET_KEY"] = SECRET_KEY
+
+    app.register_blueprint(user_bp, url_prefix="/api/users")
+    app.register_blueprint(collection_bp, url_prefix="/api/collections")
+    app.register_blueprint(ml_bp, url_prefix="/api/ml")
+    app.register_blueprint(health_bp)
+
+    @app.errorhandler(PasswordHasherBusy)
+    async def password_hasher_busy(e):
+        return jsonify({"error": "Сервер перегружен, повторите попытку позже"}), 429, {"Retry-After": "1"}
+
+    @app.before_serving
+    async def startup():
+        if start_jobs:
+            await asyncio.get_running_loop().run_in_executor(None, ensure_indexes)
+            start_scheduler()
+
+    @app.after_serving
+    async def shutdown():
+        shutdown_scheduler()
+
+    @app.route("/")
+    async def serve():
+        return await send_from_directory(app.static_folder, "index.html")
+
+    @app.route("/<path:path>")
+    async def serve_static(path):
+        return await send_from_directory(app.static_folder, path)
+
+    preload()
+    return app
+
+
+if __name__ == "__main__":
+    create_app().run(host="0.0.0.0", port=8080)
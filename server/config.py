@@ -8,5 +8,20 @@ load_dotenv()
 class Config:
     MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
     DB_NAME = os.getenv("DB_NAME", "investment_app")
+    ANALYSIS_INTERVAL_MINUTES = int(os.getenv("ANALYSIS_INTERVAL_MINUTES", "5"))
+    FULL_ANALYSIS_INTERVAL_HOURS = int(os.getenv("FULL_ANALYSIS_INTERVAL_HOURS", "24"))
+    ANALYSIS_BUDGET_SECONDS = int(os.getenv("ANALYSIS_BUDGET_SECONDS", "240"))
+
+    UNIVERSE_STOCK_BOARDS = os.getenv("UNIVERSE_STOCK_BOARDS", "TQBR").split(",")
+    UNIVERSE_BOND_BOARDS = os.getenv("UNIVERSE_BOND_BOARDS", "TQOB,TQCB").split(",")
+    UNIVERSE_MIN_VALTODAY = float(os.getenv("UNIVERSE_MIN_VALTODAY", "0"))
+    UNIVERSE_MIN_VOLTODAY = float(os.getenv("UNIVERSE_MIN_VOLTODAY", "0"))
+    UNIVERSE_MAX_SECURITIES = int(os.getenv("UNIVERSE_MAX_SECURITIES", "0"))
+
+    RISK_EVALUATION_MODE = os.getenv("RISK_EVALUATION_MODE", "table")
+
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "32"))
 
 SECRET_KEY = secrets.token_hex(32)
\ No newline at end of file
@@ -1,4 +1,5 @@
-from pymongo import MongoClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, MongoClient
+from pymongo.errors import PyMongoError
 import os
 from dotenv import load_dotenv
 
@@ -7,11 +8,55 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 DB_NAME = os.getenv("DB_NAME", "investment_app")
 
-client = MongoClient(MONGO_URI)
+# connect=False: соединение открывается при первом запросе, уже после fork воркера
+client = MongoClient(MONGO_URI, connect=False)
 db = client[DB_NAME]
 
 users_collection = db["users"]
 collections_collection = db["collections"]
 user_answers_collection = db["user_answers"]
 risk_assessment_collection = db["risk_assessment"]
-draft_collections_collection = db["draft_collections"]
\ No newline at end of file
+risk_assessment_meta_collection = db["risk_assessment_meta"]
+draft_collections_collection = db["draft_collections"]
+security_cache_collection = db["security_cache"]
+job_locks_collection = db["job_locks"]
+securities_collection = db["securities"]
+
+INDEXES = {
+    "users": [IndexModel([("login", ASCENDING)], unique=True, name="login_unique")],
+    "user_answers": [IndexModel([("user_login", ASCENDING)], unique=True, name="user_login_unique")],
+    "draft_collections": [IndexModel([("user_login", ASCENDING)], unique=True, name="user_login_unique")],
+    "collections": [IndexModel(
+        [("user_login", ASCENDING), ("creation_date", DESCENDING), ("_id", DESCENDING)],
+        name="user_login_creation_date_id"
+    )],
+    "risk_assessment": [IndexModel(
+        [("version", ASCENDING)],
+        unique=True,
+        partialFilterExpression={"version": {"$exists": True}},
+        name="version_unique"
+    )]
+}
+
+
+def ensure_indexes():
+    # Отдельный клиент, чтобы мастер-процесс gunicorn не открывал соединения общего клиента до fork
+    with MongoClient(MONGO_URI) as bootstrap_client:
+        bootstrap_db = bootstrap_client[DB_NAME]
+        for name, indexes in INDEXES.items():
+            try:
+                bootstrap_db[name].create_indexes(indexes)
+            except PyMongoError as e:
+                print(f"[Init] Не удалось создать индексы для {name}: {e}")
+    print("[Init] Индексы MongoDB проверены")
+
+_async_client = None
+
+
+def get_async_db():
+    # Motor привязывается к event loop при первом обращении, поэтому клиент создаётся лениво
+    global _async_client
+    if _async_client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        _async_client = AsyncIOMotorClient(MONGO_URI)
+    return _async_client[DB_NAME]
@@ -0,0 +1,44 @@
+import multiprocessing
+import os
+
+# WSGI: gunicorn -c gunicorn.conf.py
+# ASGI: GUNICORN_APP="asgi:create_app()" GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn.conf.py
+wsgi_app = os.getenv("GUNICORN_APP", "wsgi:app")
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8080")
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+
+# Каждый воркер держит свою копию модели и снимка, поэтому по умолчанию воркеров не больше числа ядер
+workers = int(os.getenv("GUNICORN_WORKERS", str(min(multiprocessing.cpu_count(), 4))))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+# Модели и снимок загружаются в мастере до fork и разделяются воркерами через copy-on-write
+preload_app = True
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "0"))
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    from database import ensure_indexes
+    from services.scheduler import export_risk_assessment_once
+    ensure_indexes()
+    export_risk_assessment_once()
+
+
+def post_fork(server, worker):
+    # Потоки планировщика не переживают fork, поэтому он запускается в каждом воркере;
+    # анализ рынка по-прежнему выполняет только владелец аренды в Mongo,
+    # а выгрузку risk_assessment при старте один раз сделал мастер в when_ready
+    from services.scheduler import start_scheduler
+    start_scheduler(export_on_start=False)
+
+
+def worker_exit(server, worker):
+    from services.scheduler import shutdown_scheduler
+    shutdown_scheduler()
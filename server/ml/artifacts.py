@@ -0,0 +1,110 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+
+ARTIFACTS_DIR = os.path.join("ml", "artifacts")
+WEIGHTS_FILE = "model.pth"
+META_FILE = "meta.json"
+LATEST_FILE = "LATEST"
+
+
+class ArtifactError(Exception):
+    pass
+
+
+def _model_dir(name):
+    return os.path.join(ARTIFACTS_DIR, name)
+
+
+def _write_atomic(path, data):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".artifact-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_artifact(name, state_dict, input_schema, metrics=None, extra_meta=None):
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(state_dict, buffer)
+    weights = buffer.getvalue()
+
+    version = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    version_dir = os.path.join(_model_dir(name), version)
+    suffix = 1
+    while os.path.exists(version_dir):
+        suffix += 1
+        version_dir = os.path.join(_model_dir(name), f"{version}-{suffix}")
+    version = os.path.basename(version_dir)
+    os.makedirs(version_dir)
+
+    meta = {
+        "name": name,
+        "version": version,
+        "created_at": datetime.utcnow().isoformat() + "Z",
+        "input_schema": input_schema,
+        "sha256": hashlib.sha256(weights).hexdigest(),
+        "metrics": metrics or {},
+        **(extra_meta or {})
+    }
+
+    _write_atomic(os.path.join(version_dir, WEIGHTS_FILE), weights)
+    _write_atomic(os.path.join(version_dir, META_FILE),
+                  json.dumps(meta, indent=4, ensure_ascii=False).encode("utf-8"))
+    _write_atomic(os.path.join(_model_dir(name), LATEST_FILE), version.encode("utf-8"))
+    return version
+
+
+def latest_version(name):
+    try:
+        with open(os.path.join(_model_dir(name), LATEST_FILE), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _read_artifact(name, input_schema, version=None):
+    version = version or latest_version(name)
+    if not version:
+        raise ArtifactError(f"Нет опубликованных версий модели {name}")
+
+    version_dir = os.path.join(_model_dir(name), version)
+    try:
+        with open(os.path.join(version_dir, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(os.path.join(version_dir, WEIGHTS_FILE), "rb") as f:
+            weights = f.read()
+    except (OSError, ValueError) as e:
+        raise ArtifactError(f"Не удалось прочитать модель {name}/{version}: {e}")
+
+    if meta.get("name") != name or meta.get("version") != version:
+        raise ArtifactError(f"Метаданные не соответствуют модели {name}/{version}")
+    if hashlib.sha256(weights).hexdigest() != meta.get("sha256"):
+        raise ArtifactError(f"Контрольная сумма модели {name}/{version} не совпадает")
+    if meta.get("input_schema") != input_schema:
+        raise ArtifactError(f"Схема входных данных модели {name}/{version} не совпадает")
+    return meta, weights
+
+
+def load_meta(name, input_schema, version=None):
+    meta, _ = _read_artifact(name, input_schema, version)
+    return meta
+
+
+def load_artifact(name, input_schema, version=None):
+    import torch
+
+    meta, weights = _read_artifact(name, input_schema, version)
+    state_dict = torch.load(io.BytesIO(weights))
+    return meta, state_dict
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+TIMEOUT = 10
+MAX_WORKERS = 16
+
+# Запросов в секунду на хост
+HOST_RATE_LIMITS = {
+    "iss.moex.com": 20,
+    "smart-lab.ru": 4,
+    "bcs.ru": 4
+}
+DEFAULT_RATE_LIMIT = 10
+
+# Повторы делает сам get(), а не urllib3: каждая попытка проходит через ограничитель хоста
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+MAX_BACKOFF = 30
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RateLimiter:
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_slot - now
+            self.next_slot = max(self.next_slot, now) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+_local = threading.local()
+
+
+def _limiter_for(host):
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = RateLimiter(HOST_RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT))
+        return _limiters[host]
+
+
+def get_session():
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=len(HOST_RATE_LIMITS) + 1, pool_maxsize=4)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _local.session = session
+    return session
+
+
+def _retry_after(response):
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def get(url, **kwargs):
+    limiter = _limiter_for(urlparse(url).hostname)
+    kwargs.setdefault("timeout", TIMEOUT)
+
+    for attempt in range(RETRIES + 1):
+        limiter.acquire()
+        try:
+            response = get_session().get(url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == RETRIES:
+                raise
+            delay = None
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == RETRIES:
+                return response
+            delay = _retry_after(response)
+            response.close()
+
+        if delay is None:
+            delay = BACKOFF_FACTOR * 2 ** attempt
+        time.sleep(min(delay, MAX_BACKOFF))
+
+
+def iter_many(func, items, max_workers=MAX_WORKERS):
+    def call(item):
+        try:
+            return item, func(item), None
+        except Exception as e:
+            return item, None, e
+
+    window = deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for item in items:
+            window.append(executor.submit(call, item))
+            if len(window) >= max_workers * 2:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+def fetch_many(func, items, max_workers=MAX_WORKERS):
+    return list(iter_many(func, items, max_workers))
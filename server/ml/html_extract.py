@@ -0,0 +1,88 @@
+import re
+from html import unescape
+
+_BODY = re.compile(r"<body\b[^>]*>", re.I)
+_IGNORED = re.compile(r"<!--.*?-->|<(script|style|noscript|template)\b[^>]*>.*?</\1\s*>", re.S | re.I)
+_TAG = re.compile(r"<(?:[^>\"']|\"[^\"]*\"|'[^']*')*>")
+
+# Поля страниц находятся в таблицах параметров и абзацах описания: текст собирается только из них,
+# а если блок с нужным полем не найден, поле ищется по тексту всей страницы
+SMART_LAB_BLOCKS = re.compile(r"<table\b[^>]*>.*?</table\s*>|<p\b[^>]*>.*?</p\s*>", re.S | re.I)
+BCS_BLOCKS = re.compile(r"<table\b[^>]*>.*?</table\s*>|<(p|li)\b[^>]*>.*?</\1\s*>", re.S | re.I)
+
+SMART_LAB_PATTERNS = {
+    'name': re.compile(r"Имя облигации\s*(.*?)\s"),
+    'maturity_date': re.compile(r"Дата погашения\s*(\d{2}-\d{2}-\d{4})"),
+    'coupon_size': re.compile(r"Купон, руб \(\?\)\s*([\d,.]+)"),
+    'coupon_frequency': re.compile(r"Частота купона, раз в год\s*([\d,.]+)"),
+    'yield': re.compile(r"Доходность\* облигации к погашению составляет\s*([\d,.]+)"),
+    'price': re.compile(r"Облигация .*? стоит сейчас\s*([\d,.]+)")
+}
+
+BCS_PATTERNS = {
+    'price': re.compile(r"Стоимость\s+[A-Z]+\s+на\s+\d{2}\.\d{2}\.\d{4}\s*—\s*([\d\s,.]+)"),
+    'dividend': re.compile(r"Дивиденды\s+([\d\s,.]+)"),
+    'high': re.compile(r"максимальная цена\s*—\s*([\d\s,.]+)"),
+    'low': re.compile(r"минимальная цена\s*—\s*([\d\s,.]+)")
+}
+
+
+def page_text(html, separator="", strip=False):
+    # Текст страницы без построения DOM: тело документа без скриптов, стилей и комментариев
+    body = _BODY.search(html)
+    if body:
+        html = html[body.end():]
+    chunks = (unescape(chunk) for chunk in _TAG.split(_IGNORED.sub("", html)))
+    if strip:
+        return separator.join(chunk for chunk in (c.strip() for c in chunks) if chunk)
+    return separator.join(chunks)
+
+
+def block_text(html, blocks, separator="", strip=False):
+    html = _IGNORED.sub("", html)
+    return "\n".join(page_text(block.group(0), separator, strip) for block in blocks.finditer(html))
+
+
+def _with_fallback(fields, html, extract):
+    if any(value is None for value in fields.values()):
+        full = extract(html)
+        fields = {field: full[field] if value is None else value for field, value in fields.items()}
+    return fields
+
+
+def _number(text, pattern, cast=float):
+    match = pattern.search(text)
+    if match:
+        try:
+            return cast(match.group(1).replace(',', '.').replace(' ', ''))
+        except ValueError:
+            return None
+    return None
+
+
+def _smart_lab_fields(text):
+    name_match = SMART_LAB_PATTERNS['name'].search(text)
+    frequency = _number(text, SMART_LAB_PATTERNS['coupon_frequency'])
+
+    return {
+        'name': name_match.group(1).strip() if name_match else None,
+        'maturity_date': _number(text, SMART_LAB_PATTERNS['maturity_date'], str),
+        'coupon_size': _number(text, SMART_LAB_PATTERNS['coupon_size']),
+        'coupon_frequency': round(frequency) if frequency is not None else None,
+        'yield': _number(text, SMART_LAB_PATTERNS['yield']),
+        'price': _number(text, SMART_LAB_PATTERNS['price'])
+    }
+
+
+def _bcs_fields(text):
+    return {field: _number(text, pattern) for field, pattern in BCS_PATTERNS.items()}
+
+
+def parse_smart_lab(html):
+    fields = _smart_lab_fields(block_text(html, SMART_LAB_BLOCKS))
+    return _with_fallback(fields, html, lambda page: _smart_lab_fields(page_text(page)))
+
+
+def parse_bcs(html):
+    fields = _bcs_fields(block_text(html, BCS_BLOCKS, " ", strip=True))
+    return _with_fallback(fields, html, lambda page: _bcs_fields(page_text(page, " ", strip=True)))
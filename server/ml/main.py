@@ -1,20 +1,54 @@
+import argparse
+import random
+import time
+
 import torch
 import torch.nn as nn
-import torch.optim as optim
-import requests
-import json
-import random
 
-from external_data import get_bond_data, get_stock_data_moex
+from config import Config
+from ml import fetcher, snapshot
+from ml.artifacts import load_artifact
+from ml.external_data import fill_missing_yields, get_bond_data, get_stock_data_moex, parse_board
 from models.risk_assessment_model import RiskAssessment
+from models.security_model import Security
+
+MODEL_NAME = "risk_classifier"
+INPUT_SCHEMA = {
+    "model": "RiskClassifier",
+    "features": ["asset_type", "dividend_yield_or_credit_rating"],
+    "dtype": "float32",
+    "classes": ["Low", "Medium", "High"]
+}
+
+stocks_url = 'https://iss.moex.com/iss/engines/stock/markets/shares/boards/{board}/securities.json?iss.meta=off&iss.only=securities,marketdata'
+bonds_url = 'https://iss.moex.com/iss/engines/stock/markets/bonds/boards/{board}/securities.json?iss.meta=off&iss.only=securities,marketdata'
+
+BATCH_SIZE = 32
+PARTIAL_EVERY = 64
+TRAINING_SAMPLE = 50
+
+
+class BudgetExceeded(Exception):
+    pass
 
-stocks_url = 'https://iss.moex.com/iss/engines/stock/markets/shares/boards/TQBR/securities.json'
-bonds_url = 'https://iss.moex.com/iss/engines/stock/markets/bonds/boards/TQOB/securities.json'
+
+class LeaseLost(Exception):
+    pass
+
+
+def ensure_lease(lease_lost):
+    # Аренду перехватил другой экземпляр: публиковать снимок поверх его результатов нельзя
+    if lease_lost is not None and lease_lost.is_set():
+        raise LeaseLost("Аренда блокировки анализа потеряна, публикация отменена")
+
+
+def over_budget(deadline):
+    return deadline is not None and time.monotonic() > deadline
 
 
 def get_data(url):
     try:
-        response = requests.get(url)
+        response = fetcher.get(url)
         if response.status_code == 200:
             return response.json()
         else:
@@ -24,62 +58,115 @@ def get_data(url):
         print(f"Ошибка при выполнении запроса: {e}")
         return None
 
-def extract_stock_data(data):
-    stocks = data.get('securities', {}).get('data', [])
-    stock_info = []
+def stock_record(ticker, stock_details):
+    return {
+        'name': stock_details["Название"],
+        'ticker': ticker,
+        'price': stock_details["Стоимость"],
+        'is_divids': stock_details["Наличие дивидендов"],
+        'dividend': {
+            'yield': stock_details["Размер дивиденда"],
+            'frequency': stock_details["Частота выплат дивидендов в год"]
+        },
+        'annual_return': stock_details["Доходность (%)"]
+    }
+
+
+def bond_record(bond_details):
+    return {
+        'name': bond_details['Название'],
+        'ticker': bond_details['Тикер'],
+        'coupon': {
+            'size': bond_details['Размер купона'],
+            'frequency_per_year': bond_details['Частота выплат купонов в год']
+        },
+        'maturity_date': bond_details['Дата погашения'],
+        'annual_return': bond_details['Доходность к погашению (%)'],
+        'price': bond_details['Текущая цена']
+    }
+
+
+def interleave(*streams):
+    # Потоки читаются по очереди, поэтому облигации загружаются параллельно с акциями
+    # и не остаются без бюджета времени при холодном старте
+    iterators = [iter(stream) for stream in streams]
+    while iterators:
+        for iterator in list(iterators):
+            try:
+                yield next(iterator)
+            except StopIteration:
+                iterators.remove(iterator)
+
+
+def batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_stocks(board, tickers, reused=None, stale=None, deadline=None):
+    reused = reused or {}
+    stale = stale or {}
+
+    def fetch(ticker):
+        if ticker in reused:
+            return reused[ticker]
+        if over_budget(deadline):
+            if ticker in stale:
+                return stale[ticker]
+            raise BudgetExceeded(ticker)
+        return stock_record(ticker, get_stock_data_moex(ticker, board[ticker]))
+
+    for ticker, record, error in fetcher.iter_many(fetch, tickers):
+        if isinstance(error, BudgetExceeded):
+            continue
+        if error:
+            print(f"Ошибка при получении данных по акции {ticker}: {error}")
+            continue
+        yield record
+
 
-    for stock in stocks[:50]:
-        ticker = stock[0] if len(stock) > 0 else "Нет данных"
-        print(ticker)
+def stream_bonds(board, tickers, reused=None, stale=None, deadline=None, batch_size=BATCH_SIZE):
+    reused = reused or {}
+    stale = stale or {}
 
-        try:
-            stock_details = get_stock_data_moex(ticker)
-        except Exception as e:
-            print(f"Ошибка при получении данных по облигации {ticker}: {e}")
-            continue
+    def fetch(ticker):
+        if ticker in reused:
+            return reused[ticker], None
+        if over_budget(deadline):
+            if ticker in stale:
+                return stale[ticker], None
+            raise BudgetExceeded(ticker)
+        return None, get_bond_data(ticker, board[ticker], solve_yield=False)
 
+    for batch in batched(fetcher.iter_many(fetch, tickers), batch_size):
+        fetched = []
+        for ticker, result, error in batch:
+            if isinstance(error, BudgetExceeded):
+                continue
+            if error:
+                print(f"Ошибка при получении данных по облигации {ticker}: {error}")
+                continue
+            fetched.append(result)
+
+        details = [bond_details for _, bond_details in fetched if bond_details is not None]
+        fill_missing_yields(details, [board[bond_details['Тикер']] for bond_details in details])
+
+        for record, bond_details in fetched:
+            yield record if record is not None else bond_record(bond_details)
+
+
+def extract_stock_data(board, tickers):
+    return list(stream_stocks(board, tickers))
 
-        info = {
-            'name': stock_details["Название"],
-            'ticker': ticker,
-            'price': stock_details["Стоимость"],
-            'is_divids': stock_details["Наличие дивидендов"],
-            'dividend': {
-                'yield': stock_details["Размер дивиденда"],
-                'frequency': stock_details["Частота выплат дивидендов в год"]
-            },
-            'annual_return': stock_details["Доходность (%)"]
-        }
-        stock_info.append(info)
-    return stock_info
-
-
-def extract_bond_data(data):
-    bonds = data.get('securities', {}).get('data', [])
-    bond_info = []
-
-    for bond in bonds[:50]:
-        ticker = bond[0] if len(bond) > 0 else "Нет данных"
-        print(ticker)
-
-        try:
-            bond_details = get_bond_data(ticker)
-        except Exception as e:
-            print(f"Ошибка при получении данных по облигации {ticker}: {e}")
-            continue
 
-        bond_info.append({
-            'name': bond_details['Название'],
-            'ticker': bond_details['Тикер'],
-            'coupon': {
-                'size': bond_details['Размер купона'],
-                'frequency_per_year': bond_details['Частота выплат купонов в год']
-            },
-            'maturity_date': bond_details['Дата погашения'],
-            'annual_return': bond_details['Доходность к погашению (%)'],
-            'price': bond_details['Текущая цена']
-        })
-    return bond_info
+def extract_bond_data(board, tickers):
+    return list(stream_bonds(board, tickers))
 
 
 class RiskClassifier(nn.Module):
@@ -97,33 +184,54 @@ class RiskClassifier(nn.Module):
         return x
 
 
+def dividend_yield(stock):
+    try:
+        return float(stock['dividend']['yield'])
+    except (ValueError, TypeError):
+        return 0
+
+
+def credit_rating(bond):
+    coupon_freq = bond['coupon']['frequency_per_year']
+    return 1 if coupon_freq == "AAA" else 2 if coupon_freq == "AA" else 3
+
+
+def featurize(stock_data, bond_data):
+    X = torch.zeros((len(stock_data) + len(bond_data), 2), dtype=torch.float32)
+    X[:, 1] = torch.tensor(
+        [dividend_yield(stock) for stock in stock_data] + [credit_rating(bond) for bond in bond_data],
+        dtype=torch.float32
+    )
+    return X
+
+
 def prepare_data(stock_data, bond_data):
-    X = []
-    y = []
-
-    for stock in stock_data:
-        try:
-            dividend_yield = float(stock['dividend']['yield'])
-        except (ValueError, TypeError):
-            dividend_yield = 0
-        X.append([0, dividend_yield])
-
-        if dividend_yield < 2:
-            y.append(2)  # High risk
-        else:
-            y.append(1)  # Medium risk
+    X = featurize(stock_data, bond_data)
+    n_stocks = len(stock_data)
 
-    for bond in bond_data:
-        coupon_freq = bond['coupon']['frequency_per_year']
-        credit_rating = 1 if coupon_freq == "AAA" else 2 if coupon_freq == "AA" else 3
-        X.append([0, credit_rating])
+    y = torch.empty(len(X), dtype=torch.long)
+    y[:n_stocks] = (X[:n_stocks, 1] < 2).long() + 1  # 2 - High risk, 1 - Medium risk
+    y[n_stocks:] = (X[n_stocks:, 1] == 3).long()  # 1 - Medium risk, 0 - Low risk
 
-        if credit_rating == 3:
-            y.append(1)  # Medium risk
-        else:
-            y.append(0)  # Low risk
+    return X, y
+
+
+def classify(model, stock_data, bond_data):
+    model.eval()
+    with torch.no_grad():
+        risk_levels = model(featurize(stock_data, bond_data)).argmax(dim=1).tolist()
+    return risk_levels[:len(stock_data)], risk_levels[len(stock_data):]
+
+
+def classify_stream(model, kind, records, known_levels, batch_size=BATCH_SIZE):
+    for batch in batched(records, batch_size):
+        pending = [record for record in batch if record['ticker'] not in known_levels]
+        stock_levels, bond_levels = classify(model, pending if kind == "Stocks" else [], pending if kind == "Bonds" else [])
+        levels = dict(zip((record['ticker'] for record in pending), stock_levels + bond_levels))
+
+        for record in batch:
+            yield record, known_levels.get(record['ticker'], levels.get(record['ticker']))
 
-    return torch.tensor(X, dtype=torch.float32), torch.tensor(y, dtype=torch.long)
 
 def train_model(model, criterion, optimizer, X_train, y_train, epochs=100):
     for epoch in range(epochs):
@@ -135,75 +243,165 @@ def train_model(model, criterion, optimizer, X_train, y_train, epochs=100):
         if (epoch + 1) % 10 == 0:
             print(f"Epoch [{epoch + 1}/{epochs}], Loss: {loss.item():.4f}")
 
-def run_analysis():
-    print("Запуск анализа рынка пошёл")
-    stocks_data = get_data(stocks_url)
-    bonds_data = get_data(bonds_url)
+def fetch_board(url, boards):
+    merged = {}
+    for board in boards:
+        for ticker, row in parse_board(get_data(url.format(board=board)) or {}).items():
+            merged.setdefault(ticker, row)
+    return merged
+
+
+def fetch_boards():
+    return (
+        fetch_board(stocks_url, Config.UNIVERSE_STOCK_BOARDS),
+        fetch_board(bonds_url, Config.UNIVERSE_BOND_BOARDS)
+    )
+
+
+def is_liquid(row):
+    return (
+        (row.get('VALTODAY') or 0) >= Config.UNIVERSE_MIN_VALTODAY
+        and (row.get('VOLTODAY') or 0) >= Config.UNIVERSE_MIN_VOLTODAY
+    )
+
+
+def universe_tickers(board):
+    # Самые ликвидные бумаги идут первыми: при нехватке времени они обновятся в первую очередь
+    tickers = sorted(
+        (ticker for ticker, row in board.items() if is_liquid(row)),
+        key=lambda ticker: board[ticker].get('VALTODAY') or 0,
+        reverse=True
+    )
+    if Config.UNIVERSE_MAX_SECURITIES > 0:
+        tickers = tickers[:Config.UNIVERSE_MAX_SECURITIES]
+    return tickers
+
+
+def board_fingerprint(row):
+    return [row.get('LAST'), row.get('UPDATETIME')]
+
+
+def fetch_universe(stocks_board=None, bonds_board=None):
+    if stocks_board is None or bonds_board is None:
+        stocks_board, bonds_board = fetch_boards()
 
     random.seed(42)
-    stock_info = random.sample(extract_stock_data(stocks_data), min(50, len(stocks_data['securities']['data'])))
-    bond_info = random.sample(extract_bond_data(bonds_data), min(50, len(bonds_data['securities']['data'])))
+    stock_tickers = universe_tickers(stocks_board)
+    bond_tickers = universe_tickers(bonds_board)
+    stock_tickers = random.sample(stock_tickers, min(TRAINING_SAMPLE, len(stock_tickers)))
+    bond_tickers = random.sample(bond_tickers, min(TRAINING_SAMPLE, len(bond_tickers)))
+
+    return extract_stock_data(stocks_board, stock_tickers), extract_bond_data(bonds_board, bond_tickers)
+
 
-    X_train, y_train = prepare_data(stock_info, bond_info)
+def load_classifier(version=None):
+    meta, state_dict = load_artifact(MODEL_NAME, INPUT_SCHEMA, version)
     model = RiskClassifier()
-    criterion = nn.CrossEntropyLoss()
-    optimizer = optim.Adam(model.parameters(), lr=0.001)
+    model.load_state_dict(state_dict)
+    model.eval()
+    print(f"Модель {MODEL_NAME} версии {meta['version']} загружена")
+    return model, meta['version']
+
+
+def publish(builder, classifier_version, partial=False):
+    normalized = builder.build(classifier_version=classifier_version, partial=partial)
+    version = RiskAssessment.save(normalized, partial=partial)
+    if not partial:
+        Security.upsert_many(normalized["securities"], version)
+    snapshot.write('ml/risk_assessment.json', {**normalized, "version": version})
+    print(f"Результаты сохранены в risk_assessment.json и базу данных, версия {version}" + (" (частично)" if partial else ""))
+    return version
+
+
+def split_changed(board, tickers, previous):
+    reused, changed = {}, []
+    for ticker in tickers:
+        if ticker in previous["securities"] and previous["fingerprints"].get(ticker) == board_fingerprint(board[ticker]):
+            reused[ticker] = previous["securities"][ticker]
+        else:
+            changed.append(ticker)
+    return reused, changed
 
-    train_model(model, criterion, optimizer, X_train, y_train)
-    torch.save(model.state_dict(), 'ml/risk_classifier_model.pth')
-    print("Модель обучена и сохранена в risk_classifier_model.pth")
 
-    def predict_and_save_results(model, stock_data, bond_data):
-        model.eval()
-        stock_predictions = []
-        bond_predictions = []
+def run_analysis(full=False, budget_seconds=None, lease_lost=None):
+    print("Запуск анализа рынка пошёл" + (" (полная пересборка)" if full else ""))
+    if budget_seconds is None:
+        budget_seconds = Config.ANALYSIS_BUDGET_SECONDS
+    deadline = time.monotonic() + budget_seconds if budget_seconds > 0 else None
+    model, classifier_version = load_classifier()
+
+    stocks_board, bonds_board = fetch_boards()
+    if not stocks_board or not bonds_board:
+        print("Не удалось получить списки бумаг с MOEX, анализ пропущен")
+        return None
+
+    previous = RiskAssessment.get()
+    cold_start = previous is None
+    if previous is not None and "fingerprints" not in previous:
+        previous = None
+    # Предыдущий снимок — запасной источник данных, если бюджет времени исчерпан
+    stale = previous["securities"] if previous is not None else {}
+    stale_fingerprints = previous["fingerprints"] if previous is not None else {}
+    if full:
+        previous = None
+
+    stock_tickers = universe_tickers(stocks_board)
+    bond_tickers = universe_tickers(bonds_board)
+    if not stock_tickers or not bond_tickers:
+        print("Ни одна бумага не прошла фильтры ликвидности, анализ пропущен")
+        return None
+    print(f"Вселенная анализа: акций {len(stock_tickers)}, облигаций {len(bond_tickers)}")
+    reused_stocks, reused_bonds, known_levels = {}, {}, {}
+
+    if previous is not None:
+        reused_stocks, changed_stocks = split_changed(stocks_board, stock_tickers, previous)
+        reused_bonds, changed_bonds = split_changed(bonds_board, bond_tickers, previous)
+        removed = set(previous["securities"]) - set(stock_tickers) - set(bond_tickers)
+        print(f"Изменено акций: {len(changed_stocks)}, облигаций: {len(changed_bonds)}, выбыло: {len(removed)}")
+
+        if previous.get("classifier_version") == classifier_version:
+            if not changed_stocks and not changed_bonds and not removed:
+                print("Изменений нет, снимок не обновляется")
+                return previous.get("version")
+            known_levels = {
+                ticker: previous["levels"][ticker]
+                for ticker in (*reused_stocks, *reused_bonds)
+            }
+
+    builder = snapshot.SnapshotBuilder()
+    def classified(kind, board, records):
+        for record, level in classify_stream(model, kind, records, known_levels):
+            yield kind, board, record, level
+
+    streams = interleave(
+        classified("Stocks", stocks_board, stream_stocks(stocks_board, stock_tickers, reused_stocks, stale, deadline)),
+        classified("Bonds", bonds_board, stream_bonds(bonds_board, bond_tickers, reused_bonds, stale, deadline)),
+    )
+    stale_used = 0
+    for kind, board, record, level in streams:
+        ticker = record['ticker']
+        if record is stale.get(ticker):
+            # Устаревшая запись сохраняет старый отпечаток, чтобы обновиться при следующем запуске
+            fingerprint = stale_fingerprints.get(ticker)
+            stale_used += ticker not in reused_stocks and ticker not in reused_bonds
+        else:
+            fingerprint = board_fingerprint(board[ticker])
+        builder.add(kind, record, level, fingerprint)
+        if cold_start and len(builder) % PARTIAL_EVERY == 0:
+            ensure_lease(lease_lost)
+            publish(builder, classifier_version, partial=True)
+
+    if over_budget(deadline):
+        skipped = len(stock_tickers) + len(bond_tickers) - len(builder)
+        print(f"Бюджет времени ({budget_seconds} с) исчерпан: из предыдущего снимка взято {stale_used}, пропущено {skipped}")
+
+    ensure_lease(lease_lost)
+    return publish(builder, classifier_version)
 
-        for stock in stock_data:
-            try:
-                dividend_yield = float(stock['dividend']['yield'])
-            except (ValueError, TypeError):
-                dividend_yield = 0
-            input_data = torch.tensor([[0, dividend_yield]], dtype=torch.float32)
-            output = model(input_data)
-            risk_level = torch.argmax(output, dim=1).item()
-            stock_predictions.append((stock, risk_level))
-
-        for bond in bond_data:
-            coupon_freq = bond['coupon']['frequency_per_year']
-            credit_rating = 1 if coupon_freq == "AAA" else 2 if coupon_freq == "AA" else 3
-            input_data = torch.tensor([[0, credit_rating]], dtype=torch.float32)
-            output = model(input_data)
-            risk_level = torch.argmax(output, dim=1).item()
-            bond_predictions.append((bond, risk_level))
-
-        result = {
-            "Low": {"Bonds": []},
-            "Medium": {"Stocks": [], "Bonds": []},
-            "High": {"Stocks": []}
-        }
-
-        risk_map = {0: "Low", 1: "Medium", 2: "High"}
-
-        if len(result["Low"]["Bonds"]) == 0:
-            result["Low"]["Bonds"] = bond_info[:50]
-
-        if len(result["Medium"]["Stocks"]) == 0:
-            result["Medium"]["Stocks"] = stock_info[:50]
-
-        if len(result["High"]["Stocks"]) == 0:
-            result["High"]["Stocks"] = stock_info[:50]
-
-        for stock, risk_level in stock_predictions:
-            result[risk_map[risk_level]]["Stocks"].append(stock)
-
-        for bond, risk_level in bond_predictions:
-            result[risk_map[risk_level]]["Bonds"].append(bond)
-        with open('ml/risk_assessment.json', 'w') as f:
-            json.dump(result, f, indent=4, ensure_ascii=False)
-        RiskAssessment.save(result)
-        print("Результаты сохранены в risk_assessment.json и базу данных")
-
-    predict_and_save_results(model, stock_info, bond_info)
 
 if __name__ == "__main__":
-    run_analysis()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Анализ рынка и публикация risk_assessment")
+    parser.add_argument("--full", action="store_true", help="полная пересборка без учёта предыдущего снимка")
+    args = parser.parse_args()
+
+    run_analysis(full=args.full)
@@ -1,9 +1,18 @@
 import torch
 import torch.nn as nn
-import torch.optim as optim
 import json
 import random
-
+import sys
+
+from ml import snapshot
+from ml.artifacts import load_artifact
+from ml.portfolio import (
+    INPUT_SCHEMA,
+    MODEL_NAME,
+    build_portfolio,
+    build_selection_pools,
+    get_user_input,
+)
 
 class RiskEvaluationNN(nn.Module):
     def __init__(self):
@@ -61,111 +70,36 @@ def test_model(model, test_data):
     model.eval()
     predictions = model(X_test).squeeze().round().detach().numpy()
     correct = sum(predictions == y_test.numpy())
-    print(f"Accuracy: {correct / len(y_test) * 100:.2f}%")
-
-
-def select_securities(risk_level, securities_data):
-    def is_valid_security(security):
-        if any(value is None for value in security.values()):
-            return False
-        if "coupon" in security:
-            coupon = security["coupon"]
-            return coupon and coupon.get("size", 0) > 0
-        return True
-
-    risk_categories = ["Low", "Medium", "High"]
-    category = risk_categories[risk_level]
-
-    selected_category = securities_data.get(category, {})
-
-    valid_bonds = [
-        bond for bond in selected_category.get("Bonds", [])
-        if is_valid_security(bond)
-    ]
+    accuracy = correct / len(y_test) * 100
+    print(f"Accuracy: {accuracy:.2f}%")
+    return float(accuracy)
 
-    valid_stocks = [
-        stock for stock in selected_category.get("Stocks", [])
-        if is_valid_security(stock)
-    ]
 
-    random.shuffle(valid_bonds)
-    random.shuffle(valid_stocks)
-
-    return {
-        "Bonds": valid_bonds[:10],
-        "Stocks": valid_stocks[:10]
-    }
-
-
-def calculate_expected_return(selection, weighted=False):
-    total_return = 0.0
-    total_weight = 0.0
-    count = 0
-
-    for bond in selection["Bonds"]:
-        r = bond.get("annual_return", 0) / 100
-        w = bond.get("price", 1)
-        if weighted:
-            total_return += r * w
-            total_weight += w
-        else:
-            total_return += r
-            count += 1
-
-    for stock in selection["Stocks"]:
-        r = stock.get("annual_return", 0) / 100
-        w = stock.get("price", 1)
-        if weighted:
-            total_return += r * w
-            total_weight += w
-        else:
-            total_return += r
-            count += 1
+def evaluate_risk_level(model, user_input):
+    with torch.no_grad():
+        user_input_tensor = torch.tensor([user_input], dtype=torch.float32)
+        risk_level = int(round(model(user_input_tensor).item()))
+    return min(max(risk_level, 0), 2)
 
-    if weighted and total_weight > 0:
-        return round((total_return / total_weight) * 100, 2)
-    elif count > 0:
-        return round((total_return / count) * 100, 2)
-    else:
-        return 0.0
 
+def evaluate_risk_levels(model, user_inputs):
+    with torch.no_grad():
+        user_inputs_tensor = torch.tensor(user_inputs, dtype=torch.float32)
+        risk_levels = model(user_inputs_tensor).reshape(-1).round().clamp(0, 2)
+    return [int(level) for level in risk_levels.tolist()]
 
-def get_risk_category(risk_level):
-    categories = ["Низкий", "Средний", "Высокий"]
-    return categories[risk_level]
 
-
-def main(user_answers_path, securities_path, output_path):
+def main(user_answers_path, securities_path):
     user_answers = load_json(user_answers_path)
-    securities_data = load_json(securities_path)
-
-    user_input = [
-        user_answers["question_1"]["answer_grade"],
-        user_answers["question_2"]["answer_grade"],
-        user_answers["question_3"]["answer_grade"],
-        user_answers["question_4"]["answer_grade"],
-        user_answers["question_5"]["answer_grade"]
-    ]
+    securities_data = snapshot.expand(load_json(securities_path))
 
+    _, state_dict = load_artifact(MODEL_NAME, INPUT_SCHEMA)
     model = RiskEvaluationNN()
-    model.load_state_dict(torch.load('user_risk_model.pth'))
+    model.load_state_dict(state_dict)
     model.eval()
 
-    user_input_tensor = torch.tensor([user_input], dtype=torch.float32)
-    risk_level = int(round(model(user_input_tensor).item()))
-    risk_level = min(max(risk_level, 0), 3)
-    selected_securities = select_securities(risk_level, securities_data)
-
-    result = {
-        "Bonds": selected_securities["Bonds"],
-        "Stocks": selected_securities["Stocks"],
-        "risk_category": get_risk_category(risk_level),
-        "expected_return": calculate_expected_return(selected_securities, weighted=True)
-    }
-
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(result, f, indent=4, ensure_ascii=False)
-    print(f"Результаты сохранены в {output_path}")
+    risk_level = evaluate_risk_level(model, get_user_input(user_answers))
+    return build_portfolio(risk_level, build_selection_pools(securities_data))
 
 
 def load_json(file_path):
@@ -174,26 +108,6 @@ def load_json(file_path):
 
 
 if __name__ == "__main__":
-    print("Запуск генераци подборки пошёл")
-    training_data = generate_training_data()
-    X_train, y_train = prepare_training_data(training_data)
-
-    model = RiskEvaluationNN()
-    criterion = nn.MSELoss()
-    optimizer = optim.Adam(model.parameters(), lr=0.001)
-
-    train_model(model, criterion, optimizer, X_train, y_train)
-    torch.save(model.state_dict(), 'user_risk_model.pth')
-    print("Модель обучена и сохранена в user_risk_model.pth")
-
-    test_data = generate_training_data(num_samples=200)
-    test_model(model, test_data)
-
-    user_answers_path = 'ml/user_answers.json'
-    securities_path = 'ml/risk_assessment.json'
-    output_path = 'ml/selected_securities.json'
-
-    with open("ml/selected_securities.json", "w", encoding="utf-8") as f:
-        f.write("")
-
-    main(user_answers_path, securities_path, output_path)
+    if len(sys.argv) > 1:
+        result = main(sys.argv[1], 'ml/risk_assessment.json')
+        print(json.dumps(result, indent=4, ensure_ascii=False))
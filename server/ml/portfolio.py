@@ -0,0 +1,100 @@
+import random
+
+MODEL_NAME = "risk_evaluation"
+INPUT_SCHEMA = {
+    "model": "RiskEvaluationNN",
+    "features": ["question_1", "question_2", "question_3", "question_4", "question_5"],
+    "dtype": "float32",
+    "grade_range": [0, 5],
+    "output": "risk_level"
+}
+
+
+RISK_CATEGORIES = ["Low", "Medium", "High"]
+
+
+def is_valid_security(security):
+    if any(value is None for value in security.values()):
+        return False
+    if "coupon" in security:
+        coupon = security["coupon"]
+        return coupon and coupon.get("size", 0) > 0
+    return True
+
+
+def build_selection_pools(securities_data):
+    pools = []
+    for category in RISK_CATEGORIES:
+        selected_category = securities_data.get(category, {})
+        pools.append({
+            "Bonds": tuple(bond for bond in selected_category.get("Bonds", []) if is_valid_security(bond)),
+            "Stocks": tuple(stock for stock in selected_category.get("Stocks", []) if is_valid_security(stock))
+        })
+    return pools
+
+
+def select_securities(risk_level, pools, k=10, rng=random):
+    pool = pools[risk_level]
+    return {
+        "Bonds": rng.sample(pool["Bonds"], min(k, len(pool["Bonds"]))),
+        "Stocks": rng.sample(pool["Stocks"], min(k, len(pool["Stocks"])))
+    }
+
+
+def calculate_expected_return(selection, weighted=False):
+    total_return = 0.0
+    total_weight = 0.0
+    count = 0
+
+    for bond in selection["Bonds"]:
+        r = bond.get("annual_return", 0) / 100
+        w = bond.get("price", 1)
+        if weighted:
+            total_return += r * w
+            total_weight += w
+        else:
+            total_return += r
+            count += 1
+
+    for stock in selection["Stocks"]:
+        r = stock.get("annual_return", 0) / 100
+        w = stock.get("price", 1)
+        if weighted:
+            total_return += r * w
+            total_weight += w
+        else:
+            total_return += r
+            count += 1
+
+    if weighted and total_weight > 0:
+        return round((total_return / total_weight) * 100, 2)
+    elif count > 0:
+        return round((total_return / count) * 100, 2)
+    else:
+        return 0.0
+
+
+def get_risk_category(risk_level):
+    categories = ["Низкий", "Средний", "Высокий"]
+    return categories[risk_level]
+
+
+def get_user_input(user_answers):
+    return [
+        user_answers["question_1"]["answer_grade"],
+        user_answers["question_2"]["answer_grade"],
+        user_answers["question_3"]["answer_grade"],
+        user_answers["question_4"]["answer_grade"],
+        user_answers["question_5"]["answer_grade"]
+    ]
+
+
+def build_portfolio(risk_level, pools, rng=random):
+    selected_securities = select_securities(risk_level, pools, rng=rng)
+
+    return {
+        "Bonds": selected_securities["Bonds"],
+        "Stocks": selected_securities["Stocks"],
+        "risk_category": get_risk_category(risk_level),
+        "expected_return": calculate_expected_return(selected_securities, weighted=True)
+    }
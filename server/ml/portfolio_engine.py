@@ -0,0 +1,143 @@
+import os
+import random
+from functools import lru_cache, partial
+
+from config import Config
+from ml import risk_table, snapshot
+from ml.artifacts import ArtifactError, latest_version, load_artifact, load_meta
+from ml.portfolio import (
+    INPUT_SCHEMA,
+    MODEL_NAME,
+    build_portfolio,
+    build_selection_pools,
+    get_user_input,
+)
+
+SECURITIES_PATH = os.path.join("ml", "risk_assessment.json")
+RESULT_CACHE_SIZE = 4096
+
+_model = None
+_table = None
+_model_version = None
+_pools = build_selection_pools({})
+_universe_key = None
+_universe_version = None
+_securities = {}
+
+
+def load(securities_path=SECURITIES_PATH):
+    try:
+        load_model()
+    except ArtifactError as e:
+        print(f"[Engine] {e}")
+    load_universe(securities_path)
+
+
+def _load_torch_model(version):
+    # torch импортируется только здесь: в табличном режиме с готовой таблицей он не нужен
+    from ml.main1 import RiskEvaluationNN, evaluate_risk_levels
+
+    _, state_dict = load_artifact(MODEL_NAME, INPUT_SCHEMA, version)
+    model = RiskEvaluationNN()
+    model.load_state_dict(state_dict)
+    model.eval()
+    return model, partial(evaluate_risk_levels, model)
+
+
+def load_model(version=None):
+    global _model, _table, _model_version
+    meta = load_meta(MODEL_NAME, INPUT_SCHEMA, version)
+    model = table = None
+
+    if Config.RISK_EVALUATION_MODE == "table" and meta.get("lookup_table"):
+        try:
+            table = risk_table.RiskTable.loads(meta["lookup_table"])
+        except ValueError as e:
+            raise ArtifactError(f"Таблица уровней риска модели {MODEL_NAME}/{meta['version']} повреждена: {e}")
+    else:
+        model, evaluate_many = _load_torch_model(meta["version"])
+        if Config.RISK_EVALUATION_MODE == "table":
+            # Артефакт опубликован без таблицы: строим её одним пакетным прогоном модели
+            table = risk_table.build(evaluate_many)
+            model = None
+
+    _model, _table, _model_version = model, table, meta["version"]
+    mode = "таблица" if table is not None else "модель"
+    print(f"[Engine] Модель оценки риска загружена, версия {_model_version} ({mode})")
+    return _model_version
+
+
+def refresh_model():
+    version = latest_version(MODEL_NAME)
+    if version and version != _model_version:
+        return load_model(version)
+    return _model_version
+
+
+def model_version():
+    return _model_version
+
+
+def universe_version():
+    return _universe_version
+
+
+def universe_snapshot():
+    # Версия и бумаги загруженного снимка — единственный источник данных для общей таблицы securities
+    return _universe_version, _securities
+
+
+def universe_loaded():
+    return _universe_key is not None
+
+
+def _file_key(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_universe(securities_path=SECURITIES_PATH):
+    global _pools, _universe_key, _universe_version, _securities
+    try:
+        key = _file_key(securities_path)
+        data = snapshot.load(securities_path)
+        _pools = build_selection_pools(snapshot.expand(data))
+        _universe_key, _universe_version, _securities = key, data.get("version"), data["securities"]
+        print("[Engine] Данные risk_assessment загружены")
+    except (OSError, ValueError) as e:
+        print(f"[Engine] Не удалось загрузить {securities_path}: {e}")
+
+
+def refresh_universe(securities_path=SECURITIES_PATH):
+    try:
+        if _file_key(securities_path) != _universe_key:
+            load_universe(securities_path)
+    except OSError:
+        pass
+
+
+@lru_cache(maxsize=RESULT_CACHE_SIZE)
+def _evaluate(user_input, model_version, universe_version):
+    # Версии модели и снимка входят в ключ, поэтому после их смены старые записи просто вытесняются
+    from ml.main1 import evaluate_risk_level
+    return evaluate_risk_level(_model, list(user_input))
+
+
+def _risk_level(user_input):
+    # Поиск по таблице дешевле обращения к кэшу, поэтому кэшируется только прогон модели
+    if _table is not None:
+        return _table.lookup(user_input)
+    return _evaluate(user_input, _model_version, _universe_version)
+
+
+def cache_info():
+    return _evaluate.cache_info()._asdict()
+
+
+def generate_portfolio(user_answers):
+    if _model is None and _table is None:
+        raise RuntimeError("Модель оценки риска не загружена")
+
+    risk_level = _risk_level(tuple(get_user_input(user_answers)))
+    # Отдельный генератор на каждый запрос: выборка остаётся случайной и не зависит от других потоков
+    return build_portfolio(risk_level, _pools, rng=random.Random())
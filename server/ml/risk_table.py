@@ -0,0 +1,64 @@
+from itertools import product
+
+GRADES = 6
+FEATURES = 5
+SIZE = GRADES ** FEATURES
+LEVELS = 3
+
+
+def all_inputs():
+    return product(range(GRADES), repeat=FEATURES)
+
+
+def index(user_input):
+    if len(user_input) != FEATURES:
+        raise ValueError(f"Ожидалось {FEATURES} ответов, получено {len(user_input)}")
+
+    position = 0
+    for grade in user_input:
+        if isinstance(grade, bool) or not isinstance(grade, (int, float)) or grade != int(grade) \
+                or not 0 <= grade < GRADES:
+            raise ValueError(f"Недопустимая оценка ответа: {grade!r}")
+        position = position * GRADES + int(grade)
+    return position
+
+
+class RiskTable:
+    def __init__(self, levels):
+        self.levels = bytes(levels)
+        if len(self.levels) != SIZE:
+            raise ValueError(f"Таблица уровней риска должна содержать {SIZE} значений, получено {len(self.levels)}")
+        if any(level >= LEVELS for level in self.levels):
+            raise ValueError(f"Уровень риска должен быть от 0 до {LEVELS - 1}")
+
+    def lookup(self, user_input):
+        return self.levels[index(user_input)]
+
+    def dumps(self):
+        return "".join(map(str, self.levels))
+
+    @classmethod
+    def loads(cls, text):
+        if len(text) != SIZE:
+            raise ValueError(f"Таблица уровней риска должна содержать {SIZE} значений, получено {len(text)}")
+        allowed = "".join(map(str, range(LEVELS)))
+        if text.strip(allowed):
+            raise ValueError(f"Уровень риска должен быть от 0 до {LEVELS - 1}")
+        return cls(int(level) for level in text)
+
+
+def build(evaluate_many):
+    # Один пакетный прогон модели по всем входам вместо SIZE отдельных
+    inputs = list(all_inputs())
+    levels = evaluate_many(inputs)
+    table = RiskTable(levels)
+    verify(table, inputs, levels)
+    return table
+
+
+def verify(table, inputs, levels):
+    # Сверка раскладки: по каждому входу таблица должна вернуть то, что модель выдала в том же прогоне
+    for user_input, expected in zip(inputs, levels):
+        actual = table.lookup(user_input)
+        if actual != expected:
+            raise ValueError(f"Таблица расходится с моделью на входе {user_input}: {actual} != {expected}")
@@ -0,0 +1,86 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from models.security_cache_model import SecurityCache
+
+STATIC_TTL = timedelta(days=3)
+PRICE_TTL = timedelta(minutes=15)
+MAX_STALE = timedelta(days=30)
+
+FIELD_TTLS = {
+    'price': PRICE_TTL,
+    'yield': PRICE_TTL,
+    'high': PRICE_TTL,
+    'low': PRICE_TTL
+}
+
+_executor = ThreadPoolExecutor(max_workers=4)
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+
+def _refresh(ticker, source, fetch):
+    fetched_at = datetime.utcnow()
+    values = fetch(ticker)
+    SecurityCache.save(ticker, source, values, fetched_at)
+    return values
+
+
+def _revalidate(ticker, source, fetch):
+    key = (ticker, source)
+    with _in_flight_lock:
+        if key in _in_flight:
+            return
+        _in_flight.add(key)
+
+    def run():
+        try:
+            _refresh(ticker, source, fetch)
+        except Exception as e:
+            print(f"[Cache] Ошибка фонового обновления {source} для {ticker}: {e}")
+        finally:
+            with _in_flight_lock:
+                _in_flight.discard(key)
+
+    _executor.submit(run)
+
+
+def lookup(ticker, source, fetch, fields):
+    try:
+        entry = SecurityCache.get(ticker, source)
+    except Exception as e:
+        print(f"[Cache] Кэш недоступен для {ticker}: {e}")
+        return fetch(ticker)
+
+    if entry and all(field in entry for field in fields):
+        now = datetime.utcnow()
+        ages = {field: now - entry[field]["fetched_at"] for field in fields}
+        values = {field: item["value"] for field, item in entry.items()}
+
+        if all(age < FIELD_TTLS.get(field, STATIC_TTL) for field, age in ages.items()):
+            return values
+        if all(age < MAX_STALE for age in ages.values()):
+            _revalidate(ticker, source, fetch)
+            return values
+
+    return _refresh(ticker, source, fetch)
+
+
+def shutdown():
+    # Очередь фоновых обновлений отбрасывается: устаревшие записи обновит следующий запуск
+    _executor.shutdown(wait=False, cancel_futures=True)
+
+
+def invalidate(tickers=None):
+    return SecurityCache.invalidate(tickers)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "invalidate":
+        print("Использование: python -m ml.security_cache invalidate [TICKER ...]")
+        sys.exit(1)
+
+    deleted = invalidate(sys.argv[2:])
+    print(f"Удалено записей кэша: {deleted}")
@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+
+FORMAT_VERSION = 2
+CATEGORIES = ("Low", "Medium", "High")
+FALLBACK_CATEGORIES = {"Stocks": ("Medium", "High"), "Bonds": ("Low",)}
+FALLBACK_SIZE = None
+
+
+def is_normalized(data):
+    return isinstance(data, dict) and data.get("format") == FORMAT_VERSION
+
+
+def normalize(data):
+    if is_normalized(data):
+        return data
+
+    securities = {}
+    buckets = {}
+    for category, kinds in (data or {}).items():
+        buckets[category] = {}
+        for kind, items in kinds.items():
+            tickers = buckets[category][kind] = []
+            seen = set()
+            for security in items:
+                ticker = security["ticker"]
+                securities.setdefault(ticker, security)
+                if ticker not in seen:
+                    seen.add(ticker)
+                    tickers.append(ticker)
+
+    return {"format": FORMAT_VERSION, "securities": securities, "buckets": buckets}
+
+
+def expand(data):
+    snapshot = normalize(data)
+    securities = snapshot["securities"]
+    return {
+        category: {kind: [securities[ticker] for ticker in tickers] for kind, tickers in kinds.items()}
+        for category, kinds in snapshot["buckets"].items()
+    }
+
+
+class SnapshotBuilder:
+    def __init__(self, fallback_size=FALLBACK_SIZE):
+        self.fallback_size = fallback_size
+        self.securities = {}
+        self.order = {"Stocks": [], "Bonds": []}
+        self.levels = {}
+        self.fingerprints = {}
+
+    def __len__(self):
+        return len(self.securities)
+
+    def add(self, kind, security, level, fingerprint=None):
+        ticker = security["ticker"]
+        if ticker not in self.securities:
+            self.order[kind].append(ticker)
+        self.securities[ticker] = security
+        self.levels[ticker] = level
+        if fingerprint is not None:
+            self.fingerprints[ticker] = fingerprint
+
+    def build(self, **extra):
+        buckets = {"Low": {"Bonds": []}, "Medium": {"Stocks": [], "Bonds": []}, "High": {"Stocks": []}}
+        seen = {}
+
+        for kind, tickers in self.order.items():
+            for category in FALLBACK_CATEGORIES[kind]:
+                buckets[category][kind] = tickers[:self.fallback_size]
+                seen[category, kind] = set(buckets[category][kind])
+
+            for ticker in tickers:
+                category = CATEGORIES[self.levels[ticker]]
+                bucket_seen = seen.setdefault((category, kind), set())
+                if ticker not in bucket_seen:
+                    bucket_seen.add(ticker)
+                    buckets[category].setdefault(kind, []).append(ticker)
+
+        return {
+            "format": FORMAT_VERSION,
+            "securities": dict(self.securities),
+            "buckets": buckets,
+            "levels": dict(self.levels),
+            "fingerprints": dict(self.fingerprints),
+            **extra
+        }
+
+
+def dumps(snapshot):
+    return json.dumps(snapshot, ensure_ascii=False, separators=(",", ":"))
+
+
+def load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return normalize(json.load(f))
+
+
+def write(path, snapshot):
+    # Уникальный временный файл в том же каталоге: параллельные писатели не мешают друг другу
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".snapshot-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(dumps(snapshot))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
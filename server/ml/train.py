@@ -0,0 +1,68 @@
+import argparse
+
+import torch
+import torch.nn as nn
+import torch.optim as optim
+
+from functools import partial
+
+from ml import main, main1, risk_table
+from ml.artifacts import save_artifact
+
+
+def train_risk_evaluation():
+    X_train, y_train = main1.prepare_training_data(main1.generate_training_data())
+    model = main1.RiskEvaluationNN()
+    optimizer = optim.Adam(model.parameters(), lr=0.001)
+
+    main1.train_model(model, nn.MSELoss(), optimizer, X_train, y_train)
+    accuracy = main1.test_model(model, main1.generate_training_data(num_samples=200))
+    return model, {"accuracy": accuracy}
+
+
+def train_risk_classifier():
+    stock_info, bond_info = main.fetch_universe()
+    X_train, y_train = main.prepare_data(stock_info, bond_info)
+    model = main.RiskClassifier()
+    optimizer = optim.Adam(model.parameters(), lr=0.001)
+
+    main.train_model(model, nn.CrossEntropyLoss(), optimizer, X_train, y_train)
+    return model, {"samples": len(y_train)}
+
+
+def risk_evaluation_table(model):
+    model.eval()
+    table = risk_table.build(partial(main1.evaluate_risk_levels, model))
+    print(f"Таблица уровней риска построена и сверена с моделью на {risk_table.SIZE} входах")
+    return {"lookup_table": table.dumps()}
+
+
+MODELS = {
+    main1.MODEL_NAME: (main1.RiskEvaluationNN, main1.INPUT_SCHEMA, train_risk_evaluation, risk_evaluation_table),
+    main.MODEL_NAME: (main.RiskClassifier, main.INPUT_SCHEMA, train_risk_classifier, None),
+}
+
+
+def run(name, from_weights=None):
+    model_cls, input_schema, train, build_extras = MODELS[name]
+
+    if from_weights:
+        model = model_cls()
+        model.load_state_dict(torch.load(from_weights))
+        metrics = {"imported_from": from_weights}
+    else:
+        model, metrics = train()
+
+    extra_meta = build_extras(model) if build_extras else None
+    version = save_artifact(name, model.state_dict(), input_schema, metrics, extra_meta)
+    print(f"Модель {name} сохранена, версия {version}")
+    return version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Офлайн-обучение моделей и публикация артефактов")
+    parser.add_argument("model", choices=sorted(MODELS))
+    parser.add_argument("--from-weights", help="упаковать существующий .pth без переобучения")
+    args = parser.parse_args()
+
+    run(args.model, args.from_weights)
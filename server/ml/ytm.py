@@ -0,0 +1,50 @@
+import numpy as np
+
+DEFAULT_FACE_VALUE = 1000.0
+LOW_RATE, HIGH_RATE = 0.0001, 1.0
+
+
+def _objective(rate, coupon, frequency, periods, face, dirty_price):
+    i = rate / frequency
+    v = (1 + i) ** -periods
+    annuity = (1 - v) / i
+    value = coupon * annuity + face * v - dirty_price
+
+    # Производная по годовой ставке: d/dr = (1 / f) * d/di
+    d_annuity = (periods * v / (1 + i) - annuity) / i
+    derivative = (coupon * d_annuity - face * periods * v / (1 + i)) / frequency
+    return value, derivative
+
+
+def solve_ytm(coupon, frequency, price, years, face=DEFAULT_FACE_VALUE, accrued=0.0, tol=1e-10, max_iter=50):
+    coupon, frequency, price, years, face, accrued = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (coupon, frequency, price, years, face, accrued))
+    )
+    periods = np.maximum(np.floor(frequency * years), 1)
+    dirty_price = price + accrued
+
+    low = np.full(coupon.shape, LOW_RATE)
+    high = np.full(coupon.shape, HIGH_RATE)
+
+    # Начальное приближение — приближённая доходность к погашению
+    rate = (coupon * frequency + (face - price) / years) / ((face + price) / 2)
+    rate = np.clip(np.nan_to_num(rate, nan=0.1), LOW_RATE, HIGH_RATE)
+
+    for _ in range(max_iter):
+        value, derivative = _objective(rate, coupon, frequency, periods, face, dirty_price)
+
+        above = value > 0
+        low = np.where(above, rate, low)
+        high = np.where(above, high, rate)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            candidate = rate - value / derivative
+        outside = ~np.isfinite(candidate) | (candidate <= low) | (candidate >= high)
+        candidate = np.where(outside, (low + high) / 2, candidate)
+
+        done = np.abs(candidate - rate) < tol
+        rate = candidate
+        if done.all():
+            break
+
+    return rate
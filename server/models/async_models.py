@@ -0,0 +1,135 @@
+from datetime import datetime
+from bson import ObjectId
+from pymongo import DESCENDING, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from database import get_async_db
+from models.collection_model import SUMMARY_PROJECTION, SUMMARY_SORT, summary_query
+from models.risk_assessment_model import POINTER_ID
+
+
+class AsyncUser:
+    @staticmethod
+    async def get_user_by_login(login):
+        return await get_async_db()["users"].find_one({"login": login})
+
+    @staticmethod
+    async def create_user(user):
+        try:
+            return (await get_async_db()["users"].insert_one(user)).inserted_id
+        except DuplicateKeyError:
+            return None
+
+    @staticmethod
+    async def update_user(login, update_data):
+        return await get_async_db()["users"].update_one({"login": login}, {"$set": update_data})
+
+    @staticmethod
+    async def delete_user(login):
+        db = get_async_db()
+        await db["collections"].delete_many({"user_login": login})
+        return await db["users"].delete_one({"login": login})
+
+
+class AsyncCollection:
+    @staticmethod
+    async def create_collection(collection):
+        return (await get_async_db()["collections"].insert_one(collection)).inserted_id
+
+    @staticmethod
+    def find_summaries(user_login, limit, after=None):
+        return get_async_db()["collections"].find(
+            summary_query(user_login, after), SUMMARY_PROJECTION
+        ).sort(SUMMARY_SORT).limit(limit)
+
+    @staticmethod
+    async def get_collection_by_id(collection_id):
+        return await get_async_db()["collections"].find_one({"_id": ObjectId(collection_id)})
+
+    @staticmethod
+    async def delete_collection(collection_id):
+        return await get_async_db()["collections"].delete_one({"_id": ObjectId(collection_id)})
+
+
+class AsyncSecurity:
+    @staticmethod
+    async def insert_missing(securities, snapshot_version=None):
+        operations = [
+            UpdateOne(
+                {"_id": security["ticker"]},
+                {"$setOnInsert": {"data": security, "snapshot_version": snapshot_version, "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+            for security in securities
+        ]
+        if operations:
+            await get_async_db()["securities"].bulk_write(operations, ordered=False)
+
+    @staticmethod
+    async def get_many(tickers):
+        cursor = get_async_db()["securities"].find({"_id": {"$in": list(tickers)}}, {"data": 1})
+        return {entry["_id"]: entry["data"] async for entry in cursor}
+
+
+class AsyncDraftCollection:
+    @staticmethod
+    async def save_draft(login, data):
+        await get_async_db()["draft_collections"].update_one(
+            {"user_login": login},
+            {"$set": {"data": data}},
+            upsert=True
+        )
+
+    @staticmethod
+    async def get_draft(login):
+        entry = await get_async_db()["draft_collections"].find_one({"user_login": login})
+        return entry["data"] if entry else None
+
+    @staticmethod
+    async def delete_draft(login):
+        await get_async_db()["draft_collections"].delete_one({"user_login": login})
+
+
+class AsyncUserAnswer:
+    @staticmethod
+    async def save_answers(login, answers):
+        await get_async_db()["user_answers"].update_one(
+            {"user_login": login},
+            {"$set": {"answers": answers}},
+            upsert=True
+        )
+
+    @staticmethod
+    async def get_answers(login):
+        entry = await get_async_db()["user_answers"].find_one({"user_login": login})
+        return entry["answers"] if entry else None
+
+
+class AsyncRiskAssessment:
+    @staticmethod
+    async def get(version=None):
+        db = get_async_db()
+        if version is None:
+            pointer = await db["risk_assessment_meta"].find_one({"_id": POINTER_ID})
+            version = pointer.get("current") if pointer else None
+
+        if version is None:
+            entry = await db["risk_assessment"].find_one()
+        else:
+            entry = await db["risk_assessment"].find_one({"version": version})
+
+        if not entry:
+            return None
+        if "version" in entry:
+            return {**entry["data"], "version": entry["version"]}
+        return entry["data"]
+
+    @staticmethod
+    async def list_versions():
+        cursor = get_async_db()["risk_assessment"].find(
+            {"version": {"$exists": True}}, {"version": 1, "created_at": 1, "partial": 1}
+        ).sort("version", DESCENDING)
+        return [
+            {"version": entry["version"], "created_at": entry["created_at"], "partial": entry.get("partial", False)}
+            async for entry in cursor
+        ]
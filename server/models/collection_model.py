@@ -2,27 +2,104 @@ from datetime import datetime
 
 from database import collections_collection
 from bson import ObjectId
+from pymongo import DESCENDING
+from models.security_model import Security
+
+SUMMARY_SORT = [("creation_date", DESCENDING), ("_id", DESCENDING)]
+SUMMARY_PROJECTION = {
+    "name": 1,
+    "creation_date": 1,
+    "goal": 1,
+    "expected_return": 1,
+    "risk_category": 1,
+    "deadline": 1,
+    "stocks_count": {"$size": {"$ifNull": ["$stocks", []]}},
+    "bonds_count": {"$size": {"$ifNull": ["$bonds", []]}}
+}
+
+
+def summary_query(user_login, after=None):
+    query = {"user_login": user_login}
+    if after is not None:
+        creation_date, collection_id = after
+        query["$or"] = [
+            {"creation_date": {"$lt": creation_date}},
+            {"creation_date": creation_date, "_id": {"$lt": collection_id}}
+        ]
+    return query
+
+
+def security_ref(security, total_price, universe):
+    ref = {
+        "ticker": security["ticker"],
+        "price": security.get("price"),
+        "weight": security.get("weight", round(security["price"] / total_price, 6)
+                                if total_price and isinstance(security.get("price"), (int, float)) else None)
+    }
+    if security["ticker"] not in universe:
+        # Бумаги нет в серверном снимке: ссылка сохраняется, но данные клиента в securities не попадают
+        ref["unresolved"] = True
+    return ref
+
+
+def security_refs(securities, total_price, universe):
+    return [security_ref(security, total_price, universe) for security in securities]
+
+
+def known_securities(collection, universe):
+    return [
+        universe[ref["ticker"]]
+        for kind in ("stocks", "bonds")
+        for ref in collection[kind]
+        if ref["ticker"] in universe
+    ]
+
+
+def collection_document(data, snapshot_version=None, universe=None):
+    universe = universe or {}
+    collection = {
+        "user_login": data.get("user_login"),
+        "name": data["name"],
+        "creation_date": data.get("creation_date", datetime.utcnow()),
+        "goal": data["goal"],
+        "expected_return": data.get("expected_return"),
+        "risk_category": data.get("risk_category"),
+        "deadline": data.get("deadline"),
+        "stocks": data["stocks"],
+        "bonds": data["bonds"]
+    }
+
+    securities = [*data["stocks"], *data["bonds"]]
+    if all(isinstance(security, dict) and security.get("ticker") for security in securities):
+        # Бумаги хранятся ссылками на общую таблицу securities, цена и вес фиксируются на момент сохранения
+        total_price = sum(s["price"] for s in securities if isinstance(s.get("price"), (int, float)))
+        collection.update(
+            stocks=security_refs(data["stocks"], total_price, universe),
+            bonds=security_refs(data["bonds"], total_price, universe),
+            snapshot_version=snapshot_version,
+            security_refs=True
+        )
+    return collection
+
 
 class Collection:
     @staticmethod
-    def create_collection(data):
-        collection = {
-            "user_login": data.get("user_login"),
-            "name": data["name"],
-            "creation_date": data.get("creation_date", datetime.utcnow()),
-            "goal": data["goal"],
-            "expected_return": data.get("expected_return"),
-            "risk_category": data.get("risk_category"),
-            "deadline": data.get("deadline"),
-            "stocks": data["stocks"],
-            "bonds": data["bonds"]
-        }
+    def create_collection(data, snapshot_version=None, universe=None):
+        collection = collection_document(data, snapshot_version, universe)
+        if collection.get("security_refs"):
+            Security.insert_missing(known_securities(collection, universe or {}), snapshot_version)
         return collections_collection.insert_one(collection).inserted_id
 
     @staticmethod
     def get_collections_by_user(user_login):
         return list(collections_collection.find({"user_login": user_login}))
 
+    @staticmethod
+    def find_summaries(user_login, limit, after=None):
+        return collections_collection.find(
+            summary_query(user_login, after), SUMMARY_PROJECTION
+        ).sort(SUMMARY_SORT).limit(limit)
+
     @staticmethod
     def get_collection_by_id(collection_id):
         return collections_collection.find_one({"_id": ObjectId(collection_id)})
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+from database import job_locks_collection
+
+class JobLock:
+    @staticmethod
+    def acquire(name, owner, ttl_seconds):
+        now = datetime.utcnow()
+        try:
+            job_locks_collection.update_one(
+                {"_id": name, "$or": [{"expires_at": {"$lt": now}}, {"owner": owner}]},
+                {"$set": {"owner": owner, "acquired_at": now, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    @staticmethod
+    def renew(name, owner, ttl_seconds):
+        result = job_locks_collection.update_one(
+            {"_id": name, "owner": owner},
+            {"$set": {"expires_at": datetime.utcnow() + timedelta(seconds=ttl_seconds)}}
+        )
+        return result.matched_count == 1
+
+    @staticmethod
+    def release(name, owner):
+        job_locks_collection.delete_one({"_id": name, "owner": owner})
+
+    @staticmethod
+    def get(name):
+        return job_locks_collection.find_one({"_id": name})
@@ -1,12 +1,76 @@
-from database import risk_assessment_collection
+from datetime import datetime
+
+from pymongo import DESCENDING, ReturnDocument
+
+from database import risk_assessment_collection, risk_assessment_meta_collection
+
+RETAINED_VERSIONS = 5
+POINTER_ID = "risk_assessment"
+
 
 class RiskAssessment:
     @staticmethod
-    def save(data):
-        risk_assessment_collection.delete_many({})
-        risk_assessment_collection.insert_one({"data": data})
+    def save(data, partial=False):
+        version = risk_assessment_meta_collection.find_one_and_update(
+            {"_id": POINTER_ID},
+            {"$inc": {"seq": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )["seq"]
+
+        risk_assessment_collection.insert_one({
+            "version": version,
+            "created_at": datetime.utcnow(),
+            "partial": partial,
+            "data": data
+        })
+        risk_assessment_meta_collection.update_one(
+            {"_id": POINTER_ID, "current": {"$not": {"$gt": version}}},
+            {"$set": {"current": version}}
+        )
+        RiskAssessment._prune(version)
+        return version
+
+    @staticmethod
+    def _prune(version):
+        # Частичные снимки холодного старта не занимают места в истории: хранится только последний
+        retained = [
+            entry["version"]
+            for entry in risk_assessment_collection.find(
+                {"version": {"$exists": True}, "partial": {"$ne": True}}, {"version": 1}
+            ).sort("version", DESCENDING).limit(RETAINED_VERSIONS)
+        ]
+        stale = [
+            {"version": {"$exists": False}},
+            {"partial": True, "version": {"$lt": version}}
+        ]
+        if len(retained) == RETAINED_VERSIONS:
+            stale.append({"version": {"$lt": retained[-1]}})
+        risk_assessment_collection.delete_many({"$or": stale})
+
+    @staticmethod
+    def current_version():
+        pointer = risk_assessment_meta_collection.find_one({"_id": POINTER_ID})
+        return pointer.get("current") if pointer else None
+
+    @staticmethod
+    def get(version=None):
+        version = version or RiskAssessment.current_version()
+        if version is None:
+            entry = risk_assessment_collection.find_one()
+        else:
+            entry = risk_assessment_collection.find_one({"version": version})
+        if not entry:
+            return None
+        if "version" in entry:
+            return {**entry["data"], "version": entry["version"]}
+        return entry["data"]
 
     @staticmethod
-    def get():
-        entry = risk_assessment_collection.find_one()
-        return entry["data"] if entry else None
\ No newline at end of file
+    def list_versions():
+        return [
+            {"version": entry["version"], "created_at": entry["created_at"], "partial": entry.get("partial", False)}
+            for entry in risk_assessment_collection.find(
+                {"version": {"$exists": True}}, {"version": 1, "created_at": 1, "partial": 1}
+            ).sort("version", DESCENDING)
+        ]
@@ -0,0 +1,23 @@
+from database import security_cache_collection
+
+class SecurityCache:
+    @staticmethod
+    def get(ticker, source):
+        entry = security_cache_collection.find_one({"_id": ticker}, {source: 1})
+        return entry.get(source) if entry else None
+
+    @staticmethod
+    def save(ticker, source, values, fetched_at):
+        security_cache_collection.update_one(
+            {"_id": ticker},
+            {"$set": {
+                f"{source}.{field}": {"value": value, "fetched_at": fetched_at}
+                for field, value in values.items()
+            }},
+            upsert=True
+        )
+
+    @staticmethod
+    def invalidate(tickers=None):
+        query = {"_id": {"$in": list(tickers)}} if tickers else {}
+        return security_cache_collection.delete_many(query).deleted_count
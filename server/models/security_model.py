@@ -0,0 +1,40 @@
+from datetime import datetime
+from pymongo import UpdateOne
+from database import securities_collection
+
+
+class Security:
+    @staticmethod
+    def upsert_many(securities, snapshot_version):
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"_id": ticker},
+                {"$set": {"data": security, "snapshot_version": snapshot_version, "updated_at": now}},
+                upsert=True
+            )
+            for ticker, security in securities.items()
+        ]
+        if operations:
+            securities_collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    @staticmethod
+    def insert_missing(securities, snapshot_version=None):
+        operations = [
+            UpdateOne(
+                {"_id": security["ticker"]},
+                {"$setOnInsert": {"data": security, "snapshot_version": snapshot_version, "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+            for security in securities
+        ]
+        if operations:
+            securities_collection.bulk_write(operations, ordered=False)
+
+    @staticmethod
+    def get_many(tickers):
+        return {
+            entry["_id"]: entry["data"]
+            for entry in securities_collection.find({"_id": {"$in": list(tickers)}}, {"data": 1})
+        }
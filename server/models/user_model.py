@@ -1,18 +1,28 @@
+from pymongo.errors import DuplicateKeyError
+
 from database import users_collection
-from werkzeug.security import generate_password_hash
+from services.password_service import PasswordService
+
+
+def user_document(data, hashed_password):
+    return {
+        "login": data["login"],
+        "email": data["email"],
+        "phone": data["phone"],
+        "password": hashed_password,
+        "birthdate": data["birthdate"]
+    }
+
 
 class User:
     @staticmethod
     def create_user(data):
-        hashed_password = generate_password_hash(data["password"])
-        user = {
-            "login": data["login"],
-            "email": data["email"],
-            "phone": data["phone"],
-            "password": hashed_password,
-            "birthdate": data["birthdate"]
-        }
-        return users_collection.insert_one(user).inserted_id
+        hashed_password = PasswordService.hash_password(data["password"])
+        try:
+            return users_collection.insert_one(user_document(data, hashed_password)).inserted_id
+        except DuplicateKeyError:
+            # Параллельная регистрация с тем же логином: проверку прошли оба запроса, вставка — только один
+            return None
 
     @staticmethod
     def get_user_by_login(login):
@@ -22,11 +32,15 @@ class User:
     def update_user(login, updated_data):
         update_query = {k: v for k, v in updated_data.items() if v}
         if "password" in update_query:
-            update_query["password"] = generate_password_hash(update_query["password"])
+            update_query["password"] = PasswordService.hash_password(update_query["password"])
         return users_collection.update_one({"login": login}, {"$set": update_query})
 
+    @staticmethod
+    def set_password_hash(login, hashed_password):
+        return users_collection.update_one({"login": login}, {"$set": {"password": hashed_password}})
+
     @staticmethod
     def delete_user(login):
         from database import collections_collection
         collections_collection.delete_many({"user_login": login})
-        return users_collection.delete_one({"login": login})
\ No newline at end of file
+        return users_collection.delete_one({"login": login})
@@ -0,0 +1,106 @@
+from quart import Blueprint, Response, current_app, request, jsonify
+from quart.utils import run_sync
+
+from ml import portfolio_engine
+from models.async_models import AsyncCollection, AsyncDraftCollection, AsyncSecurity, AsyncUserAnswer
+from models.collection_model import collection_document, known_securities
+from services.collection_service import (
+    collection_created, collection_detail, collection_error, page_tail, parse_page, summary_chunk
+)
+from services.security_service import SecurityService, collection_tickers
+
+collection_bp = Blueprint("collection_bp", __name__)
+
+
+async def create(data):
+    error = collection_error(data)
+    if error:
+        return error
+
+    snapshot_version, universe = portfolio_engine.universe_snapshot()
+    collection = collection_document(data, snapshot_version, universe)
+    if collection.get("security_refs"):
+        await AsyncSecurity.insert_missing(known_securities(collection, universe), snapshot_version)
+    return collection_created(await AsyncCollection.create_collection(collection))
+
+
+@collection_bp.route("/", methods=["POST"])
+async def create_collection():
+    return await create(await request.get_json())
+
+
+@collection_bp.route("/user/<user_login>", methods=["GET"])
+async def get_collections(user_login):
+    try:
+        limit, after = parse_page(request.args.get("limit"), request.args.get("cursor"))
+    except (ValueError, TypeError, KeyError):
+        return {"error": "Неверные параметры пагинации"}, 400
+
+    summaries = AsyncCollection.find_summaries(user_login, limit + 1, after)
+    dumps = current_app.json.dumps
+
+    async def generate():
+        yield "{\"collections\":["
+        last, has_more, i = None, False, 0
+        async for collection in summaries:
+            if i == limit:
+                has_more = True
+                break
+            yield summary_chunk(collection, last is None, dumps)
+            last, i = collection, i + 1
+        yield page_tail(last, has_more, dumps)
+
+    return Response(generate(), mimetype="application/json"), 200
+
+
+@collection_bp.route("/<collection_id>", methods=["GET"])
+async def get_collection(collection_id):
+    collection = await AsyncCollection.get_collection_by_id(collection_id)
+    if not collection:
+        return {"error": "Подборка не найдена"}, 404
+
+    details = {}
+    if collection.get("security_refs"):
+        details, missing = SecurityService.cached(collection_tickers(collection))
+        if missing:
+            loaded = await AsyncSecurity.get_many(missing)
+            SecurityService.remember(loaded)
+            details.update(loaded)
+    return collection_detail(SecurityService.expand_collection(collection, details))
+
+
+@collection_bp.route("/<collection_id>", methods=["DELETE"])
+async def delete_collection(collection_id):
+    deleted = await AsyncCollection.delete_collection(collection_id)
+    if deleted.deleted_count == 0:
+        return {"error": "Подборка не найдена"}, 404
+    return {"message": "Подборка удалена"}
+
+
+@collection_bp.route("/draft", methods=["GET"])
+async def get_draft_collection():
+    login = request.args.get("login")
+    user_answers = await AsyncUserAnswer.get_answers(login) if login else None
+    if not user_answers:
+        return {"error": "Ответы не найдены"}, 400
+
+    return await run_sync(portfolio_engine.generate_portfolio)(user_answers)
+
+
+@collection_bp.route("/save", methods=["POST"])
+async def save_collection():
+    return await create(await request.get_json())
+
+
+@collection_bp.route("/draft/<user_login>", methods=["GET"])
+async def get_user_draft(user_login):
+    draft = await AsyncDraftCollection.get_draft(user_login)
+    if draft:
+        return jsonify(draft), 200
+    return jsonify({"error": "Заготовка не найдена"}), 404
+
+
+@collection_bp.route("/draft/<user_login>", methods=["DELETE"])
+async def delete_user_draft(user_login):
+    await AsyncDraftCollection.delete_draft(user_login)
+    return jsonify({"message": "Заготовка удалена"}), 200
@@ -0,0 +1,16 @@
+from quart import Blueprint
+from quart.utils import run_sync
+
+from services.health_service import HealthService
+
+health_bp = Blueprint("health_bp", __name__)
+
+
+@health_bp.route("/healthz", methods=["GET"])
+async def healthz():
+    return HealthService.liveness()
+
+
+@health_bp.route("/readyz", methods=["GET"])
+async def readyz():
+    return await run_sync(HealthService.readiness)()
@@ -0,0 +1,105 @@
+from quart import Blueprint, Response, request, jsonify
+from quart.utils import run_sync
+
+from ml import portfolio_engine
+from models.async_models import AsyncDraftCollection, AsyncRiskAssessment, AsyncUserAnswer
+from services.ml_service import (
+    MLService, answers_error, portfolio_request_error, variant_name, variant_response, version_payload
+)
+from services.snapshot_cache import market_snapshot
+
+ml_bp = Blueprint("ml_bp", __name__)
+
+
+@ml_bp.route("/analyze_market", methods=["GET"])
+async def analyze_market():
+    fmt = request.args.get("format")
+    version = request.args.get("version", type=int)
+    try:
+        # Чтение файла снимка и сжатие при промахе кэша не должны блокировать цикл событий
+        name = variant_name(fmt)
+        entry, variant = market_snapshot.cached(name) or await run_sync(market_snapshot.variant)(name)
+        if version is not None and version != entry.data.get("version"):
+            data = await AsyncRiskAssessment.get(version)
+            body, status = await run_sync(version_payload)(data, fmt)
+            return jsonify(body), status
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    response = variant_response(Response, entry, variant, "gzip" in request.accept_encodings)
+    await response.make_conditional(request)
+    return response
+
+
+@ml_bp.route("/snapshots", methods=["GET"])
+async def list_snapshots():
+    try:
+        return jsonify({"versions": await AsyncRiskAssessment.list_versions()}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@ml_bp.route("/generate_portfolio", methods=["POST"])
+async def generate_portfolio():
+    try:
+        data = await request.get_json()
+        login = data.get("login")
+        user_answers = await AsyncUserAnswer.get_answers(login) if login else None
+        error = portfolio_request_error(data, user_answers)
+        if error:
+            return error
+
+        try:
+            portfolio_data = await run_sync(portfolio_engine.generate_portfolio)(user_answers)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+        await AsyncDraftCollection.save_draft(login, portfolio_data)
+        return jsonify(portfolio_data)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@ml_bp.route("/save_answers", methods=["POST"])
+async def save_answers():
+    try:
+        data = await request.get_json()
+        login = data.get("login")
+        answers = data.get("answers")
+
+        error = answers_error(login, answers)
+        if error:
+            return error
+
+        await AsyncUserAnswer.save_answers(login, answers)
+        return jsonify({"message": "Ответы сохранены"}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@ml_bp.route("/analysis_status", methods=["GET"])
+async def analysis_status():
+    try:
+        return jsonify(await run_sync(MLService.analysis_status)()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@ml_bp.route("/reload_model", methods=["POST"])
+async def reload_model():
+    try:
+        return jsonify({"model_version": await run_sync(MLService.reload_model)()}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@ml_bp.route("/reset", methods=["POST"])
+async def reset_generation():
+    try:
+        login = (await request.get_json(silent=True) or {}).get("login")
+        if login:
+            await AsyncDraftCollection.delete_draft(login)
+
+        return jsonify({"message": "Подборка сброшена"}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
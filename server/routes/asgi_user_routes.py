@@ -0,0 +1,137 @@
+import asyncio
+from quart import Blueprint, request, jsonify
+from quart_cors import route_cors
+
+from models.async_models import AsyncUser
+from models.user_model import user_document
+from services.password_service import PasswordHasherBusy, PasswordService
+from services.user_service import (
+    invalid_credentials, jwt_identity, login_error, login_response, registered_response, registration_error,
+    reset_password_error, update_request, user_deleted, user_exists_error, user_not_found, user_response
+)
+
+user_bp = Blueprint("user_bp", __name__)
+
+
+async def hash_password(password):
+    return await asyncio.wrap_future(PasswordService.hash_future(password))
+
+
+async def verify_password(password, hashed):
+    return await asyncio.wrap_future(PasswordService.verify_future(password, hashed))
+
+
+@user_bp.route("/register", methods=["POST"])
+@route_cors(allow_origin="http://localhost:5173")
+async def register():
+    data = await request.get_json()
+    error = registration_error(data)
+    if error:
+        return error
+
+    if await AsyncUser.get_user_by_login(data["login"]):
+        return user_exists_error()
+
+    user = user_document(data, await hash_password(data["password"]))
+    if await AsyncUser.create_user(user) is None:
+        return user_exists_error()
+    return registered_response()
+
+
+@user_bp.route("/login", methods=["POST"])
+@route_cors(allow_origin="http://localhost:5173")
+async def login():
+    data = await request.get_json()
+    error = login_error(data)
+    if error:
+        return error
+
+    user = await AsyncUser.get_user_by_login(data["login"])
+    if not user:
+        return invalid_credentials()
+
+    valid, needs_rehash = await verify_password(data["password"], user["password"])
+    if not valid:
+        return invalid_credentials()
+    if needs_rehash:
+        PasswordService.rehash_in_background(user["login"], data["password"])
+
+    return login_response(user["login"])
+
+
+@user_bp.route("/<login>", methods=["GET"])
+async def get_user(login):
+    return user_response(await AsyncUser.get_user_by_login(login))
+
+
+@user_bp.route("/update", methods=["PUT"])
+async def update_user():
+    login, update_data, error = update_request(await request.get_json())
+    if error:
+        return error
+
+    try:
+        if "password" in update_data:
+            update_data["password"] = await hash_password(update_data["password"])
+        await AsyncUser.update_user(login, update_data)
+        return jsonify({"message": "Данные обновлены"}), 200
+    except PasswordHasherBusy:
+        raise
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+async def delete_user_by_login(login):
+    if not await AsyncUser.get_user_by_login(login):
+        return user_not_found()
+
+    await AsyncUser.delete_user(login)
+    return user_deleted()
+
+
+@user_bp.route("/<login>", methods=["DELETE"])
+async def delete_current_user(login):
+    return await delete_user_by_login(login)
+
+
+@user_bp.route("/me", methods=["GET"])
+async def get_current_user():
+    login, error = jwt_identity(request.headers.get("Authorization"))
+    if error:
+        return error
+
+    user = await AsyncUser.get_user_by_login(login)
+    if not user:
+        return user_not_found()
+
+    return jsonify({"login": user["login"]}), 200
+
+
+@user_bp.route("/logout", methods=["POST"])
+async def logout():
+    return jsonify({"message": "Выход выполнен успешно"}), 200
+
+
+@user_bp.route("/delete", methods=["DELETE"])
+async def delete_user():
+    data = await request.get_json()
+
+    if not data or "login" not in data:
+        return jsonify({"error": "Логин обязателен"}), 400
+
+    return await delete_user_by_login(data["login"])
+
+
+@user_bp.route("/reset_password", methods=["POST"])
+async def reset_password():
+    data = await request.get_json()
+    error = reset_password_error(data)
+    if error:
+        return error
+
+    if not await AsyncUser.get_user_by_login(data["login"]):
+        return user_not_found()
+
+    await AsyncUser.update_user(data["login"], {"password": await hash_password(data["new_password"])})
+
+    return jsonify({"message": "Пароль успешно изменён"}), 200
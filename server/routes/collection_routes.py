@@ -10,7 +10,7 @@ def create_collection():
 
 @collection_bp.route("/user/<user_login>", methods=["GET"])
 def get_collections(user_login):
-    return CollectionService.get_collections(user_login)
+    return CollectionService.get_collections(user_login, request.args.get("limit"), request.args.get("cursor"))
 
 @collection_bp.route("/<collection_id>", methods=["GET"])
 def get_collection(collection_id):
@@ -22,7 +22,7 @@ def delete_collection(collection_id):
 
 @collection_bp.route("/draft", methods=["GET"])
 def get_draft_collection():
-    return CollectionService.get_draft_collection()
+    return CollectionService.get_draft_collection(request.args.get("login"))
 
 @collection_bp.route("/save", methods=["POST"])
 def save_collection():
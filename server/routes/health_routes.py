@@ -0,0 +1,15 @@
+from flask import Blueprint
+
+from services.health_service import HealthService
+
+health_bp = Blueprint("health_bp", __name__)
+
+
+@health_bp.route("/healthz", methods=["GET"])
+def healthz():
+    return HealthService.liveness()
+
+
+@health_bp.route("/readyz", methods=["GET"])
+def readyz():
+    return HealthService.readiness()
@@ -1,38 +1,33 @@
-import os
-import json
 from flask import Blueprint, request, jsonify
 
-from services.ml_service import MLService
+from services.ml_service import MLService, answers_error, portfolio_request_error
 from services.user_answer_service import UserAnswerService
+from models.draft_collection_model import DraftCollection
 
 ml_bp = Blueprint("ml_bp", __name__)
-USER_ANSWERS_PATH = os.path.join("ml", "user_answers.json")
-
-FILES_TO_CLEAR = [
-    "ml/user_answers.json",
-    "ml/selected_securities.json"
-]
 
 
 @ml_bp.route("/analyze_market", methods=["GET"])
 def analyze_market():
-    return jsonify(MLService.analyze_market())
+    return MLService.analyze_market(request.args.get("format"), request, request.args.get("version", type=int))
+
+
+@ml_bp.route("/snapshots", methods=["GET"])
+def list_snapshots():
+    return MLService.list_snapshots()
 
 
 @ml_bp.route("/generate_portfolio", methods=["POST"])
 def generate_portfolio():
     try:
         login = request.json.get("login")
-        if not UserAnswerService.dump_answers_to_file(login):
-            return jsonify({"error": "Ответы не найдены"}), 400
-
-        market_data = request.json.get("market_data")
-        if not market_data:
-            return jsonify({"error": "Отсутствуют данные рынка"}), 400
+        user_answers = UserAnswerService.get_answers(login)
+        error = portfolio_request_error(request.json, user_answers)
+        if error:
+            return error
 
-        portfolio_data = MLService.generate_portfolio(market_data, login)
-
-        return jsonify(portfolio_data)
+        body, status = MLService.generate_portfolio(user_answers, login)
+        return jsonify(body), status
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -44,22 +39,38 @@ def save_answers():
         login = data.get("login")
         answers = data.get("answers")
 
-        if not login or not isinstance(answers, dict):
-            return jsonify({"error": "Неверный формат данных"}), 400
+        error = answers_error(login, answers)
+        if error:
+            return error
 
         return UserAnswerService.save_user_answers(login, answers)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@ml_bp.route("/analysis_status", methods=["GET"])
+def analysis_status():
+    try:
+        return jsonify(MLService.analysis_status()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@ml_bp.route("/reload_model", methods=["POST"])
+def reload_model():
+    try:
+        return jsonify({"model_version": MLService.reload_model()}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @ml_bp.route("/reset", methods=["POST"])
 def reset_generation():
     try:
-        for file_path in FILES_TO_CLEAR:
-            if os.path.exists(file_path):
-                with open(file_path, "w", encoding="utf-8") as f:
-                    json.dump({}, f, ensure_ascii=False, indent=4)
+        login = (request.get_json(silent=True) or {}).get("login")
+        if login:
+            DraftCollection.delete_draft(login)
 
-        return jsonify({"message": "Файлы очищены"}), 200
+        return jsonify({"message": "Подборка сброшена"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
@@ -1,7 +1,8 @@
-import bcrypt
 from flask import Blueprint, request, jsonify
 from database import users_collection
-from services.user_service import UserService
+from services.user_service import UserService, reset_password_error, update_request, user_not_found
+from models.user_model import User
+from services.password_service import PasswordHasherBusy
 from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request, get_jwt
 from flask_cors import cross_origin
 
@@ -24,20 +25,15 @@ def get_user(login):
 
 @user_bp.route("/update", methods=["PUT"])
 def update_user():
-    data = request.json
-
-    if not data or "login" not in data:
-        return jsonify({"error": "Логин обязателен"}), 400
-
-    login = data.pop("login")
-    update_data = {k: v for k, v in data.items() if v}
-
-    if not update_data:
-        return jsonify({"error": "Нет изменений"}), 400
+    login, update_data, error = update_request(request.json)
+    if error:
+        return error
 
     try:
-        users_collection.update_one({"login": login}, {"$set": update_data})
+        User.update_user(login, update_data)
         return jsonify({"message": "Данные обновлены"}), 200
+    except PasswordHasherBusy:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -59,7 +55,7 @@ def get_current_user():
 
     user = users_collection.find_one({"login": login})
     if not user:
-        return jsonify({"error": "Пользователь не найден"}), 404
+        return user_not_found()
 
     return jsonify({"login": user["login"]}), 200
 
@@ -81,21 +77,14 @@ def delete_user():
 @user_bp.route("/reset_password", methods=["POST"])
 def reset_password():
     data = request.json
-    login = data.get("login")
-    new_password = data.get("new_password")
-    confirm_password = data.get("confirm_password")
-
-    if not login or not new_password or not confirm_password:
-        return jsonify({"error": "Все поля обязательны"}), 400
+    error = reset_password_error(data)
+    if error:
+        return error
 
-    if new_password != confirm_password:
-        return jsonify({"error": "Пароли не совпадают"}), 400
-
-    user = users_collection.find_one({"login": login})
+    user = users_collection.find_one({"login": data["login"]})
     if not user:
-        return jsonify({"error": "Пользователь не найден"}), 404
+        return user_not_found()
 
-    hashed_password = bcrypt.hashpw(new_password.encode("utf-8"), bcrypt.gensalt())
-    users_collection.update_one({"login": login}, {"$set": {"password": hashed_password.decode("utf-8")}})
+    User.update_user(data["login"], {"password": data["new_password"]})
 
-    return jsonify({"message": "Пароль успешно изменён"}), 200
\ No newline at end of file
+    return jsonify({"message": "Пароль успешно изменён"}), 200
@@ -1,48 +1,110 @@
-from flask import jsonify
-import json
-import subprocess
-import time
-from database import collections_collection
+import base64
+from bson import json_util
+from flask import Response, current_app, stream_with_context
 from models.collection_model import Collection
+from models.user_answer_model import UserAnswer
+from ml import portfolio_engine
+from services.security_service import SecurityService, collection_tickers
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(collection):
+    raw = json_util.dumps({"creation_date": collection.get("creation_date"), "id": collection["_id"]})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(token):
+    data = json_util.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    return data["creation_date"], data["id"]
+
+
+def parse_page(limit, cursor):
+    limit = DEFAULT_PAGE_SIZE if limit is None else int(limit)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(limit)
+    return limit, decode_cursor(cursor) if cursor else None
+
+
+def summary_chunk(collection, first, dumps):
+    item = dict(collection, _id=str(collection["_id"]))
+    return ("" if first else ",") + dumps(item)
+
+
+def page_tail(last, has_more, dumps):
+    return "],\"next_cursor\":" + dumps(encode_cursor(last) if has_more else None) + "}"
+
+
+def collection_detail(collection):
+    return {
+        "id": str(collection["_id"]),
+        "name": collection["name"],
+        "creation_date": collection["creation_date"],
+        "goal": collection["goal"],
+        "expected_return": collection["expected_return"],
+        "risk_category": collection["risk_category"],
+        "deadline": collection["deadline"],
+        "stocks": collection["stocks"],
+        "bonds": collection["bonds"]
+    }
+
+
+def collection_error(data):
+    if not data or "user_login" not in data or not data["user_login"]:
+        return {"error": "Не указан логин пользователя"}, 400
+    if data.get("expected_return") is None:
+        return {"error": "Отсутствует доходность"}, 400
+    return None
+
+
+def collection_created(collection_id):
+    return {"message": "Подборка создана", "collection_id": str(collection_id)}
 
 
 class CollectionService:
     @staticmethod
     def create_collection(data):
-        if "user_login" not in data or not data["user_login"]:
-            return {"error": "Не указан логин пользователя"}, 400
+        error = collection_error(data)
+        if error:
+            return error
 
-        expected_return = data.get("expected_return")
-        if expected_return is None:
-            return {"error": "Отсутствует доходность"}, 400
-
-        collection_id = Collection.create_collection(data)
-        return {"message": "Подборка создана", "collection_id": str(collection_id)}
+        snapshot_version, universe = portfolio_engine.universe_snapshot()
+        collection_id = Collection.create_collection(data, snapshot_version, universe)
+        return collection_created(collection_id)
 
     @staticmethod
-    def get_collections(user_login):
-        collections = list(collections_collection.find({"user_login": user_login}))
+    def get_collections(user_login, limit=None, cursor=None):
+        try:
+            limit, after = parse_page(limit, cursor)
+        except (ValueError, TypeError, KeyError):
+            return {"error": "Неверные параметры пагинации"}, 400
+
+        # На одну запись больше, чтобы узнать, есть ли следующая страница
+        summaries = Collection.find_summaries(user_login, limit + 1, after)
+        dumps = current_app.json.dumps
+
+        def generate():
+            yield "{\"collections\":["
+            last, has_more = None, False
+            for i, collection in enumerate(summaries):
+                if i == limit:
+                    has_more = True
+                    break
+                yield summary_chunk(collection, last is None, dumps)
+                last = collection
+            yield page_tail(last, has_more, dumps)
 
-        for collection in collections:
-            collection["_id"] = str(collection["_id"])
-        return jsonify({"collections": collections}), 200
+        return Response(stream_with_context(generate()), mimetype="application/json"), 200
 
     @staticmethod
     def get_collection(collection_id):
         collection = Collection.get_collection_by_id(collection_id)
         if not collection:
             return {"error": "Подборка не найдена"}, 404
-        return {
-            "id": str(collection["_id"]),
-            "name": collection["name"],
-            "creation_date": collection["creation_date"],
-            "goal": collection["goal"],
-            "expected_return": collection["expected_return"],
-            "risk_category": collection["risk_category"],
-            "deadline": collection["deadline"],
-            "stocks": collection["stocks"],
-            "bonds": collection["bonds"]
-        }
+
+        details = SecurityService.resolve(collection_tickers(collection)) if collection.get("security_refs") else {}
+        return collection_detail(SecurityService.expand_collection(collection, details))
 
     @staticmethod
     def delete_collection(collection_id):
@@ -52,11 +114,9 @@ class CollectionService:
         return {"message": "Подборка удалена"}
 
     @staticmethod
-    def get_draft_collection():
-        subprocess.run(["python", "ml/main1.py"])
-        time.sleep(2)
-
-        with open("ml/selected_securities.json", "r", encoding="utf-8") as f:
-            draft_collection = json.load(f)
+    def get_draft_collection(login):
+        user_answers = UserAnswer.get_answers(login) if login else None
+        if not user_answers:
+            return {"error": "Ответы не найдены"}, 400
 
-        return draft_collection
+        return portfolio_engine.generate_portfolio(user_answers)
@@ -0,0 +1,36 @@
+import pymongo
+
+from database import client
+from ml import portfolio_engine
+from services.snapshot_cache import market_snapshot
+
+READINESS_TIMEOUT_SECONDS = 2
+
+
+class HealthService:
+    @staticmethod
+    def liveness():
+        return {"status": "ok"}, 200
+
+    @staticmethod
+    def readiness():
+        checks = {
+            "model": portfolio_engine.model_version() is not None,
+            "universe": portfolio_engine.universe_loaded()
+        }
+
+        try:
+            market_snapshot.get()
+            checks["snapshot"] = True
+        except Exception:
+            checks["snapshot"] = False
+
+        try:
+            with pymongo.timeout(READINESS_TIMEOUT_SECONDS):
+                client.admin.command("ping")
+            checks["mongo"] = True
+        except Exception:
+            checks["mongo"] = False
+
+        ready = all(checks.values())
+        return {"status": "ok" if ready else "unavailable", "checks": checks}, 200 if ready else 503
@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from models.job_lock_model import JobLock
+
+LOCK_NAME = "market_analysis"
+LEASE_SECONDS = 300
+HEARTBEAT_SECONDS = 60
+
+_spawn = multiprocessing.get_context("spawn")
+
+
+def run_analysis(full, lease_lost):
+    from ml.main import run_analysis
+    return run_analysis(full=full, lease_lost=lease_lost)
+
+
+def _analysis_process(analysis, full, lease_lost, conn):
+    # Анализ идёт в отдельном процессе: torch и модели не загружаются в веб-воркеры
+    try:
+        conn.send((analysis(full, lease_lost), None))
+    except Exception as e:
+        conn.send((None, str(e)))
+    finally:
+        conn.close()
+        # Обычное завершение ждёт все фоновые обновления кэша, а аренда всё это время занята
+        from ml import security_cache
+        security_cache.shutdown()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(0)
+
+
+class MarketAnalysisJob:
+    def __init__(self, on_complete=None):
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.on_complete = on_complete
+        self.analysis = run_analysis
+        self._process = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="market-analysis")
+        self._running = threading.Lock()
+        self._stats = {
+            "running": False,
+            "runs": 0,
+            "failures": 0,
+            "skipped": 0,
+            "last_started_at": None,
+            "last_finished_at": None,
+            "last_duration_seconds": None,
+            "last_full": None,
+            "last_version": None,
+            "last_error": None
+        }
+
+    def submit(self, full=False):
+        if not self._running.acquire(blocking=False):
+            self._stats["skipped"] += 1
+            print("[Analysis] Предыдущий анализ ещё выполняется, запуск пропущен")
+            return False
+
+        self._executor.submit(self._run, full)
+        return True
+
+    def _heartbeat(self, stop, lost):
+        while not stop.wait(HEARTBEAT_SECONDS):
+            if not JobLock.renew(LOCK_NAME, self.owner, LEASE_SECONDS):
+                print("[Analysis] Аренда блокировки потеряна")
+                lost.set()
+                return
+
+    def _run(self, full):
+        try:
+            if not JobLock.acquire(LOCK_NAME, self.owner, LEASE_SECONDS):
+                self._stats["skipped"] += 1
+                print("[Analysis] Анализ уже выполняется другим экземпляром, запуск пропущен")
+                return
+
+            stop, lost = threading.Event(), _spawn.Event()
+            threading.Thread(target=self._heartbeat, args=(stop, lost), daemon=True).start()
+
+            started = time.monotonic()
+            self._stats.update(running=True, last_started_at=datetime.utcnow(), last_full=full)
+            try:
+                self._stats["last_version"] = self._run_process(full, lost)
+                self._stats["last_error"] = None
+            except Exception as e:
+                self._stats["failures"] += 1
+                self._stats["last_error"] = str(e)
+                print(f"[Analysis] Ошибка при анализе рынка: {e}")
+            finally:
+                stop.set()
+                JobLock.release(LOCK_NAME, self.owner)
+                self._stats.update(
+                    running=False,
+                    runs=self._stats["runs"] + 1,
+                    last_finished_at=datetime.utcnow(),
+                    last_duration_seconds=round(time.monotonic() - started, 3)
+                )
+
+            if self.on_complete and self._stats["last_error"] is None:
+                self.on_complete()
+        except Exception as e:
+            print(f"[Analysis] Ошибка планировщика анализа: {e}")
+        finally:
+            self._running.release()
+
+    def _run_process(self, full, lease_lost):
+        receiver, sender = _spawn.Pipe(duplex=False)
+        process = _spawn.Process(
+            target=_analysis_process, args=(self.analysis, full, lease_lost, sender), name="market-analysis", daemon=True
+        )
+        process.start()
+        sender.close()
+        self._process = process
+        try:
+            version, error = receiver.recv()
+        except EOFError:
+            version, error = None, None
+        finally:
+            receiver.close()
+            process.join()
+            self._process = None
+
+        if error is None and process.exitcode != 0:
+            error = f"Процесс анализа завершился с кодом {process.exitcode}"
+        if error is not None:
+            raise RuntimeError(error)
+        return version
+
+    def status(self):
+        status = dict(self._stats, owner=self.owner)
+        try:
+            lease = JobLock.get(LOCK_NAME)
+            status["lease"] = {"owner": lease["owner"], "expires_at": lease["expires_at"]} if lease else None
+        except Exception as e:
+            status["lease"] = {"error": str(e)}
+        return status
+
+    def shutdown(self):
+        process = self._process
+        if process is not None and process.is_alive():
+            process.terminate()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+market_analysis_job = MarketAnalysisJob()
@@ -1,28 +1,87 @@
-import subprocess
-import json
+from flask import Response, jsonify
+
+from ml import portfolio_engine, snapshot
+from models.risk_assessment_model import RiskAssessment
+from services.market_analysis_job import market_analysis_job
+from services.snapshot_cache import market_snapshot
+
+
+def variant_name(fmt):
+    return "compact" if fmt == "compact" else "expanded"
+
+
+def version_payload(data, fmt):
+    if not data:
+        return {"error": "Версия не найдена"}, 404
+    return data if fmt == "compact" else snapshot.expand(data), 200
+
+
+def variant_response(response_class, entry, variant, use_gzip):
+    # Flask и Quart строят ответ одинаково; условный ответ каждый слой проверяет сам
+    response = response_class(variant.gzipped if use_gzip else variant.body, mimetype="application/json")
+    if use_gzip:
+        response.headers["Content-Encoding"] = "gzip"
+    response.headers["Vary"] = "Accept-Encoding"
+    response.set_etag(f"{variant.etag}-gz" if use_gzip else variant.etag)
+    response.last_modified = entry.last_modified
+    response.cache_control.no_cache = True
+    if entry.data.get("version") is not None:
+        response.headers["X-Snapshot-Version"] = str(entry.data["version"])
+    return response
+
+
+def portfolio_request_error(data, user_answers):
+    if not user_answers:
+        return {"error": "Ответы не найдены"}, 400
+    if not data.get("market_data"):
+        return {"error": "Отсутствуют данные рынка"}, 400
+    return None
+
+
+def answers_error(login, answers):
+    if not login or not isinstance(answers, dict):
+        return {"error": "Неверный формат данных"}, 400
+    return None
+
 
 class MLService:
     @staticmethod
-    def analyze_market():
+    def analyze_market(fmt, req, version=None):
         try:
-            with open("ml/risk_assessment.json", "r", encoding="utf-8") as f:
-                return json.load(f)
+            entry, variant = market_snapshot.variant(variant_name(fmt))
+            if version is not None and version != entry.data.get("version"):
+                body, status = version_payload(RiskAssessment.get(version), fmt)
+                return jsonify(body), status
         except Exception as e:
-            return {"error": str(e)}, 500
+            return jsonify({"error": str(e)}), 500
+
+        use_gzip = "gzip" in req.accept_encodings
+        return variant_response(Response, entry, variant, use_gzip).make_conditional(req)
 
     @staticmethod
-    def generate_portfolio(market_data, login):
+    def list_snapshots():
         try:
-            input_data = json.dumps({"market_data": market_data, "user_answers": {}})
-            result = subprocess.run(["python", "ml/main1.py"], input=input_data, capture_output=True, text=True)
+            return jsonify({"versions": RiskAssessment.list_versions()}), 200
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
 
-            with open("ml/selected_securities.json", "r", encoding="utf-8") as f:
-                portfolio_data = json.load(f)
+    @staticmethod
+    def generate_portfolio(user_answers, login):
+        try:
+            portfolio_data = portfolio_engine.generate_portfolio(user_answers)
 
             if login:
                 from models.draft_collection_model import DraftCollection
                 DraftCollection.save_draft(login, portfolio_data)
 
-            return portfolio_data
+            return portfolio_data, 200
         except Exception as e:
             return {"error": str(e)}, 500
+
+    @staticmethod
+    def reload_model():
+        return portfolio_engine.refresh_model()
+
+    @staticmethod
+    def analysis_status():
+        return {**market_analysis_job.status(), "portfolio_cache": portfolio_engine.cache_info()}
@@ -0,0 +1,101 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+from config import Config
+
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _is_bcrypt(hashed):
+    return hashed.startswith(("$2a$", "$2b$", "$2y$"))
+
+
+def _verify(password, hashed, rounds):
+    if _is_bcrypt(hashed):
+        valid = bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+        return valid, valid and int(hashed.split("$")[2]) != rounds
+
+    # Хэши werkzeug, которые раньше создавал User.create_user
+    from werkzeug.security import check_password_hash
+    valid = check_password_hash(hashed, password)
+    return valid, valid
+
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(Config.PASSWORD_HASH_WORKERS + Config.PASSWORD_HASH_QUEUE)
+
+
+def _get_pool():
+    # Пул создаётся лениво, уже в воркере после fork; spawn не наследует потоки и блокировки родителя
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=Config.PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _pool
+
+
+class PasswordService:
+    @staticmethod
+    def submit(func, *args):
+        if not _slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Очередь хэширования паролей переполнена")
+
+        try:
+            future = _get_pool().submit(func, *args)
+        except Exception:
+            _slots.release()
+            raise
+        future.add_done_callback(lambda _: _slots.release())
+        return future
+
+    @staticmethod
+    def hash_future(password):
+        return PasswordService.submit(_hash, password, Config.BCRYPT_ROUNDS)
+
+    @staticmethod
+    def verify_future(password, hashed):
+        return PasswordService.submit(_verify, password, hashed, Config.BCRYPT_ROUNDS)
+
+    @staticmethod
+    def hash_password(password):
+        return PasswordService.hash_future(password).result()
+
+    @staticmethod
+    def verify_password(password, hashed):
+        return PasswordService.verify_future(password, hashed).result()
+
+    @staticmethod
+    def rehash_in_background(login, password):
+        try:
+            future = PasswordService.hash_future(password)
+        except PasswordHasherBusy:
+            return
+
+        def save(done):
+            try:
+                from models.user_model import User
+                User.set_password_hash(login, done.result())
+                print(f"[Auth] Пароль пользователя {login} перехэширован")
+            except Exception as e:
+                print(f"[Auth] Не удалось перехэшировать пароль {login}: {e}")
+
+        future.add_done_callback(save)
+
+    @staticmethod
+    def shutdown():
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,121 @@
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.triggers.date import DateTrigger
+from datetime import datetime, timedelta
+import atexit
+import multiprocessing
+
+from config import Config
+from models.risk_assessment_model import RiskAssessment
+from ml import portfolio_engine, snapshot
+from services.snapshot_cache import market_snapshot
+from services.market_analysis_job import market_analysis_job
+from services.password_service import PasswordService
+from services.security_service import SecurityService
+
+scheduler = BackgroundScheduler()
+
+
+def on_market_analysis_complete():
+    market_snapshot.invalidate()
+    SecurityService.invalidate()
+    portfolio_engine.load_universe()
+    print("[APScheduler] Анализ завершён")
+
+
+def run_market_analysis(full=False):
+    print("[APScheduler] Запуск анализа рынка...")
+    market_analysis_job.submit(full)
+
+
+def refresh_portfolio_model():
+    try:
+        portfolio_engine.refresh_model()
+        portfolio_engine.refresh_universe()
+    except Exception as e:
+        print(f"[APScheduler] Ошибка при обновлении модели: {e}")
+
+    try:
+        # Снимок мог опубликовать экземпляр на другом хосте: файл догоняет указатель в базе
+        current = RiskAssessment.current_version()
+        if current is not None and current != portfolio_engine.universe_version():
+            export_risk_assessment_to_file()
+    except Exception as e:
+        print(f"[APScheduler] Ошибка при синхронизации снимка: {e}")
+
+
+def export_risk_assessment_to_file():
+    data = RiskAssessment.get()
+    if data:
+        snapshot.write("ml/risk_assessment.json", snapshot.normalize(data))
+        market_snapshot.invalidate()
+        portfolio_engine.load_universe()
+        print("[Init] Risk assessment выгружен из базы")
+    else:
+        print("[Init] Нет данных risk_assessment в базе")
+
+
+def export_risk_assessment_once():
+    # Мастер gunicorn не должен открывать соединения с Mongo до fork, поэтому выгрузка
+    # выполняется один раз в отдельном процессе, а мастер лишь перечитывает готовый файл
+    process = multiprocessing.get_context("spawn").Process(target=export_risk_assessment_to_file)
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        print(f"[Init] Выгрузка risk_assessment завершилась с кодом {process.exitcode}")
+    market_snapshot.invalidate()
+    portfolio_engine.load_universe()
+
+
+def shutdown_scheduler():
+    if scheduler.running:
+        scheduler.shutdown()
+    market_analysis_job.shutdown()
+    PasswordService.shutdown()
+
+
+def start_scheduler(export_on_start=True):
+    if scheduler.running:
+        return
+
+    market_analysis_job.on_complete = on_market_analysis_complete
+    scheduler.start()
+
+    scheduler.add_job(
+        run_market_analysis,
+        trigger=IntervalTrigger(minutes=Config.ANALYSIS_INTERVAL_MINUTES),
+        id='market_analysis_job',
+        replace_existing=True
+    )
+
+    scheduler.add_job(
+        run_market_analysis,
+        trigger=IntervalTrigger(hours=Config.FULL_ANALYSIS_INTERVAL_HOURS),
+        kwargs={"full": True},
+        id='full_market_analysis_job',
+        replace_existing=True
+    )
+
+    scheduler.add_job(
+        run_market_analysis,
+        trigger=DateTrigger(run_date=datetime.now() + timedelta(seconds=30)),
+        id='initial_market_analysis',
+        replace_existing=True
+    )
+
+    scheduler.add_job(
+        refresh_portfolio_model,
+        trigger=IntervalTrigger(minutes=1),
+        id='model_refresh_job',
+        replace_existing=True
+    )
+
+    if export_on_start:
+        scheduler.add_job(
+            export_risk_assessment_to_file,
+            trigger=DateTrigger(run_date=datetime.now() + timedelta(seconds=1)),
+            id='export_risk_assessment',
+            replace_existing=True
+        )
+
+    atexit.register(shutdown_scheduler)
@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+
+from models.security_model import Security
+
+CACHE_SIZE = 4096
+CACHE_TTL_SECONDS = 300
+
+
+class _LRUCache:
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        found = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                item = self._items.get(key)
+                if item is None:
+                    continue
+                value, stored_at = item
+                if now - stored_at > self.ttl:
+                    del self._items[key]
+                    continue
+                self._items.move_to_end(key)
+                found[key] = value
+        return found
+
+    def put_many(self, items):
+        now = time.monotonic()
+        with self._lock:
+            for key, value in items.items():
+                self._items[key] = (value, now)
+                self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+_cache = _LRUCache(CACHE_SIZE, CACHE_TTL_SECONDS)
+
+
+def collection_tickers(collection):
+    return {ref["ticker"] for kind in ("stocks", "bonds") for ref in collection.get(kind) or []}
+
+
+def resolve_refs(refs, details):
+    return [{**details.get(ref["ticker"], {}), **ref} for ref in refs]
+
+
+class SecurityService:
+    @staticmethod
+    def cached(tickers):
+        found = _cache.get_many(tickers)
+        return found, [ticker for ticker in tickers if ticker not in found]
+
+    @staticmethod
+    def remember(details):
+        _cache.put_many(details)
+
+    @staticmethod
+    def resolve(tickers):
+        found, missing = SecurityService.cached(tickers)
+        if missing:
+            loaded = Security.get_many(missing)
+            SecurityService.remember(loaded)
+            found.update(loaded)
+        return found
+
+    @staticmethod
+    def expand_collection(collection, details):
+        if not collection.get("security_refs"):
+            return collection
+        return {
+            **collection,
+            "stocks": resolve_refs(collection.get("stocks") or [], details),
+            "bonds": resolve_refs(collection.get("bonds") or [], details)
+        }
+
+    @staticmethod
+    def invalidate():
+        _cache.clear()
@@ -0,0 +1,70 @@
+import gzip
+import hashlib
+import os
+import threading
+from datetime import datetime, timezone
+
+from ml import snapshot
+
+
+class _Variant:
+    def __init__(self, body):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=6)
+        self.etag = hashlib.sha1(body).hexdigest()
+
+
+class _Entry:
+    def __init__(self, key, data, last_modified):
+        self.key = key
+        self.data = data
+        self.last_modified = last_modified
+        self.variants = {}
+
+
+class SnapshotCache:
+    def __init__(self, path):
+        self.path = path
+        self._entry = None
+        self._lock = threading.Lock()
+
+    def _stat_key(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self):
+        key = self._stat_key()
+        entry = self._entry
+        if entry is None or entry.key != key:
+            with self._lock:
+                entry = self._entry
+                if entry is None or entry.key != key:
+                    last_modified = datetime.fromtimestamp(key[0] / 1e9, timezone.utc).replace(microsecond=0)
+                    entry = _Entry(key, snapshot.load(self.path), last_modified)
+                    self._entry = entry
+        return entry
+
+    def cached(self, fmt):
+        # Готовый вариант без чтения файла и сжатия, либо None, если его нужно построить
+        entry = self._entry
+        if entry is None or entry.key != self._stat_key():
+            return None
+        variant = entry.variants.get(fmt)
+        return (entry, variant) if variant is not None else None
+
+    def variant(self, fmt):
+        entry = self.get()
+        variant = entry.variants.get(fmt)
+        if variant is None:
+            with self._lock:
+                variant = entry.variants.get(fmt)
+                if variant is None:
+                    data = entry.data if fmt == "compact" else snapshot.expand(entry.data)
+                    variant = entry.variants[fmt] = _Variant(snapshot.dumps(data).encode("utf-8"))
+        return entry, variant
+
+    def invalidate(self):
+        self._entry = None
+
+
+market_snapshot = SnapshotCache(os.path.join("ml", "risk_assessment.json"))
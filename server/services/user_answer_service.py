@@ -11,15 +11,9 @@ class UserAnswerService:
             return jsonify({"error": str(e)}), 500
 
     @staticmethod
-    def dump_answers_to_file(login, filepath="ml/user_answers.json"):
+    def get_answers(login):
         try:
-            answers = UserAnswer.get_answers(login)
-            if not answers:
-                return False
-            import json
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(answers, f, indent=4, ensure_ascii=False)
-            return True
+            return UserAnswer.get_answers(login) if login else None
         except Exception as e:
-            print("Ошибка при выгрузке ответов:", e)
-            return False
\ No newline at end of file
+            print("Ошибка при получении ответов:", e)
+            return None
@@ -1,10 +1,103 @@
-import bcrypt
 import jwt
 from datetime import datetime, timedelta
-from flask import jsonify
 from database import users_collection, collections_collection
 from config import SECRET_KEY
 from models.user_model import User
+from services.password_service import PasswordService
+
+REQUIRED_FIELDS = ["login", "email", "phone", "password", "birthdate"]
+BEARER = "Bearer "
+
+
+# Проверки и тела ответов общие для Flask и ASGI: различается только работа с базой
+
+
+def registration_error(data):
+    if not data or not all(field in data and data[field] for field in REQUIRED_FIELDS):
+        return {"error": "Все поля обязательны"}, 400
+    return None
+
+
+def user_exists_error():
+    return {"error": "Пользователь с таким логином уже существует"}, 400
+
+
+def registered_response():
+    return {"message": "Пользователь зарегистрирован успешно"}, 201
+
+
+def login_error(data):
+    if not data or "login" not in data or "password" not in data:
+        return {"error": "Введите логин и пароль"}, 400
+    return None
+
+
+def invalid_credentials():
+    return {"error": "Неверный логин или пароль"}, 401
+
+
+def login_response(login):
+    token = jwt.encode(
+        {"login": login, "exp": datetime.utcnow() + timedelta(hours=24)},
+        SECRET_KEY,
+        algorithm="HS256"
+    )
+    return {"message": "Авторизация успешна", "token": token, "login": login}, 200
+
+
+def user_not_found():
+    return {"error": "Пользователь не найден"}, 404
+
+
+def user_deleted():
+    return {"message": "Пользователь и его подборки удалены"}, 200
+
+
+def user_response(user):
+    if user:
+        user["_id"] = str(user["_id"])
+        return user, 200
+    return user_not_found()
+
+
+def update_request(data):
+    if not data or "login" not in data:
+        return None, None, ({"error": "Логин обязателен"}, 400)
+
+    update_data = {k: v for k, v in data.items() if k != "login" and v}
+    if not update_data:
+        return None, None, ({"error": "Нет изменений"}, 400)
+    return data["login"], update_data, None
+
+
+def reset_password_error(data):
+    data = data or {}
+    if not data.get("login") or not data.get("new_password") or not data.get("confirm_password"):
+        return {"error": "Все поля обязательны"}, 400
+    if data["new_password"] != data["confirm_password"]:
+        return {"error": "Пароли не совпадают"}, 400
+    return None
+
+
+def jwt_identity(header):
+    # Те же проверки и ответы, что у flask_jwt_extended: логин берётся только из claim sub
+    if not header:
+        return None, ({"msg": "Missing Authorization Header"}, 401)
+    if not header.startswith(BEARER):
+        return None, ({"msg": "Missing 'Bearer' type in 'Authorization' header. Expected 'Authorization: Bearer <JWT>'"}, 401)
+
+    try:
+        claims = jwt.decode(header[len(BEARER):], SECRET_KEY, algorithms=["HS256"])
+    except jwt.ExpiredSignatureError:
+        return None, ({"msg": "Token has expired"}, 401)
+    except jwt.InvalidTokenError as e:
+        return None, ({"msg": str(e)}, 422)
+
+    if "sub" not in claims:
+        return None, ({"msg": "Missing claim: sub"}, 422)
+    if claims.get("type") == "refresh":
+        return None, ({"msg": "Only non-refresh tokens are allowed"}, 422)
+    return claims["sub"], None
 
 
 class UserService:
@@ -12,64 +105,54 @@ class UserService:
     def register_user(data):
         print("Получены данные для регистрации:", data)
 
-        required_fields = ["login", "email", "phone", "password", "birthdate"]
-        if not all(field in data and data[field] for field in required_fields):
+        error = registration_error(data)
+        if error:
             print("Ошибка: не все поля заполнены")
-            return jsonify({"error": "Все поля обязательны"}), 400
+            return error
 
         if users_collection.find_one({"login": data["login"]}):
             print("Ошибка: пользователь с таким логином уже существует")
-            return jsonify({"error": "Пользователь с таким логином уже существует"}), 400
+            return user_exists_error()
 
-        hashed_password = bcrypt.hashpw(data["password"].encode("utf-8"), bcrypt.gensalt())
-
-        user = {
-            "login": data["login"],
-            "email": data["email"],
-            "phone": data["phone"],
-            "password": hashed_password.decode("utf-8"),
-            "birthdate": data["birthdate"],
-        }
-
-        result = users_collection.insert_one(user)
-        print("Добавлен новый пользователь, ID:", result.inserted_id)
+        inserted_id = User.create_user(data)
+        if inserted_id is None:
+            print("Ошибка: пользователь с таким логином уже существует")
+            return user_exists_error()
+        print("Добавлен новый пользователь, ID:", inserted_id)
 
-        return jsonify({"message": "Пользователь зарегистрирован успешно"}), 201
+        return registered_response()
 
     @staticmethod
     def login_user(data):
-        if "login" not in data or "password" not in data:
-            return jsonify({"error": "Введите логин и пароль"}), 400
+        error = login_error(data)
+        if error:
+            return error
 
         user = users_collection.find_one({"login": data["login"]})
-        if not user or not bcrypt.checkpw(data["password"].encode("utf-8"), user["password"].encode("utf-8")):
-            return jsonify({"error": "Неверный логин или пароль"}), 401
+        if not user:
+            return invalid_credentials()
 
-        token = jwt.encode(
-            {"login": user["login"], "exp": datetime.utcnow() + timedelta(hours=24)},
-            SECRET_KEY,
-            algorithm="HS256"
-        )
+        valid, needs_rehash = PasswordService.verify_password(data["password"], user["password"])
+        if not valid:
+            return invalid_credentials()
+        if needs_rehash:
+            PasswordService.rehash_in_background(user["login"], data["password"])
 
-        return jsonify({"message": "Авторизация успешна", "token": token, "login": user["login"]}), 200
+        return login_response(user["login"])
 
     @staticmethod
     def delete_user(login):
         user = users_collection.find_one({"login": login})
 
         if not user:
-            return {"error": "Пользователь не найден"}, 404
+            return user_not_found()
 
         users_collection.delete_one({"login": login})
 
         collections_collection.delete_many({"user_login": login})
 
-        return {"message": "Пользователь и его подборки удалены"}, 200
+        return user_deleted()
 
     @staticmethod
     def get_user(login):
-        user = User.get_user_by_login(login)
-        if user:
-            user["_id"] = str(user["_id"])
-            return jsonify(user), 200
-        return jsonify({"error": "Пользователь не найден"}), 404
\ No newline at end of file
+        return user_response(User.get_user_by_login(login))
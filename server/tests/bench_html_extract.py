@@ -0,0 +1,27 @@
+# Сравнение разбора страниц smart-lab и bcs.ru: python tests/bench_html_extract.py [повторов]
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml import html_extract
+from test_html_extract import fixture, soup_bcs, soup_smart_lab
+
+CASES = (
+    ("smart-lab", fixture("smart_lab_bond.html"), soup_smart_lab, html_extract.parse_smart_lab,
+     lambda html: html_extract._smart_lab_fields(html_extract.page_text(html))),
+    ("bcs.ru", fixture("bcs_stock.html"), soup_bcs, html_extract.parse_bcs,
+     lambda html: html_extract._bcs_fields(html_extract.page_text(html, " ", strip=True))),
+)
+
+
+def main(number):
+    print(f"{'страница':<10} {'BeautifulSoup':>14} {'весь текст':>12} {'блоки':>10}  (мс на страницу)")
+    for name, html, soup, scoped, full in CASES:
+        timings = [timeit.timeit(lambda: parse(html), number=number) / number * 1000 for parse in (soup, full, scoped)]
+        print(f"{name:<10} {timings[0]:>14.2f} {timings[1]:>12.2f} {timings[2]:>10.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,13 @@
+import os
+import sys
+
+import pytest
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+
+
+@pytest.fixture(autouse=True)
+def server_cwd(monkeypatch):
+    # Пути к снимку и артефактам в приложении относительные — от каталога server
+    monkeypatch.chdir(SERVER_DIR)
@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+from ml import main
+from services import scheduler
+
+
+@pytest.fixture
+def analysis(monkeypatch):
+    published = []
+    board = {"AAA": {"VALTODAY": 1}, "BBB": {"VALTODAY": 2}, "BAAA": {}, "BBBB": {}}
+
+    monkeypatch.setattr(main, "load_classifier", lambda: (None, "v1"))
+    monkeypatch.setattr(main, "fetch_boards", lambda: (board, board))
+    monkeypatch.setattr(main, "universe_tickers", lambda b: ["AAA", "BBB"])
+    monkeypatch.setattr(main.RiskAssessment, "get", staticmethod(lambda version=None: None))
+    monkeypatch.setattr(main, "stream_stocks", lambda b, tickers, *args: iter([{"ticker": t} for t in tickers]))
+    monkeypatch.setattr(main, "stream_bonds", lambda b, tickers, *args: iter([{"ticker": f"B{t}"} for t in tickers]))
+    monkeypatch.setattr(main, "classify_stream", lambda model, kind, records, known: ((r, 1) for r in records))
+    monkeypatch.setattr(main, "publish", lambda builder, version, partial=False: published.append(partial) or 7)
+    return published
+
+
+def test_publishes_while_lease_is_held(analysis):
+    assert main.run_analysis(budget_seconds=0, lease_lost=threading.Event()) == 7
+    assert analysis == [False]
+
+
+def test_lost_lease_aborts_before_publish(analysis):
+    lost = threading.Event()
+    lost.set()
+
+    with pytest.raises(main.LeaseLost):
+        main.run_analysis(budget_seconds=0, lease_lost=lost)
+    assert analysis == []
+
+
+@pytest.mark.parametrize("current, loaded, exported", [(5, 4, True), (5, 5, False), (None, 4, False)])
+def test_refresh_reexports_when_versions_differ(monkeypatch, current, loaded, exported):
+    calls = []
+    monkeypatch.setattr(scheduler.portfolio_engine, "refresh_model", lambda: None)
+    monkeypatch.setattr(scheduler.portfolio_engine, "refresh_universe", lambda: None)
+    monkeypatch.setattr(scheduler.portfolio_engine, "universe_version", lambda: loaded)
+    monkeypatch.setattr(scheduler.RiskAssessment, "current_version", staticmethod(lambda: current))
+    monkeypatch.setattr(scheduler, "export_risk_assessment_to_file", lambda: calls.append(True))
+
+    scheduler.refresh_portfolio_model()
+
+    assert bool(calls) == exported
+
+
+def test_interleave_alternates_until_every_stream_is_exhausted():
+    assert list(main.interleave("ab", "1234", "")) == ["a", "1", "b", "2", "3", "4"]
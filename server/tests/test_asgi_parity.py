@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+import jwt
+import pytest
+
+import asgi
+import routes.user_routes
+from app import create_app
+from config import SECRET_KEY
+from models.async_models import AsyncUser
+
+
+def token(claims, key=SECRET_KEY):
+    return "Bearer " + jwt.encode(claims, key, algorithm="HS256")
+
+
+TOKENS = {
+    "missing": None,
+    "not_bearer": "abc",
+    "garbage": "Bearer abc",
+    "login_claim": token({"login": "bob", "exp": int(time.time()) + 600}),
+    "sub": token({"sub": "bob", "exp": int(time.time()) + 600}),
+    "access": token({"sub": "bob", "type": "access"}),
+    "refresh": token({"sub": "bob", "type": "refresh"}),
+    "unknown_user": token({"sub": "alice"}),
+    "expired": token({"sub": "bob", "exp": int(time.time()) - 600}),
+    "bad_signature": token({"sub": "bob"}, "x" * 32),
+    "non_string_sub": token({"sub": 5}),
+}
+
+
+def find_user(login):
+    return {"login": login} if login == "bob" else None
+
+
+@pytest.fixture(scope="module")
+def clients():
+    return create_app().test_client(), asgi.create_app(start_jobs=False).test_client()
+
+
+@pytest.fixture(autouse=True)
+def users(monkeypatch):
+    collection = mock.MagicMock()
+    collection.find_one.side_effect = lambda query: find_user(query["login"])
+    monkeypatch.setattr(routes.user_routes, "users_collection", collection)
+
+    async def get_user_by_login(login):
+        return find_user(login)
+
+    monkeypatch.setattr(AsyncUser, "get_user_by_login", staticmethod(get_user_by_login))
+
+
+@pytest.mark.parametrize("name", TOKENS)
+def test_me_matches_flask_jwt_extended(clients, name):
+    flask_client, quart_client = clients
+    headers = {"Authorization": TOKENS[name]} if TOKENS[name] else {}
+
+    expected = flask_client.get("/api/users/me", headers=headers)
+
+    async def call():
+        response = await quart_client.get("/api/users/me", headers=headers)
+        return response.status_code, await response.get_json()
+
+    assert asyncio.run(call()) == (expected.status_code, expected.get_json())
+
+
+@pytest.mark.parametrize("body", [{}, {"login": "bob"}, {"login": "bob", "email": ""}])
+def test_update_validation_matches(clients, body):
+    flask_client, quart_client = clients
+    expected = flask_client.put("/api/users/update", json=body)
+
+    async def call():
+        response = await quart_client.put("/api/users/update", json=body)
+        return response.status_code, await response.get_json()
+
+    assert asyncio.run(call()) == (expected.status_code, expected.get_json())
+
+
+def test_analyze_market_builds_cache_off_the_event_loop(clients, monkeypatch):
+    _, quart_client = clients
+    from services.snapshot_cache import market_snapshot
+    market_snapshot.invalidate()
+    loop_threads = []
+    build = market_snapshot.variant
+
+    def variant(fmt):
+        loop_threads.append(threading.current_thread() is threading.main_thread())
+        return build(fmt)
+
+    monkeypatch.setattr(market_snapshot, "variant", variant)
+
+    async def call():
+        first = await quart_client.get("/api/ml/analyze_market?format=compact")
+        second = await quart_client.get("/api/ml/analyze_market?format=compact")
+        return first.status_code, second.status_code, first.headers["ETag"] == second.headers["ETag"]
+
+    assert asyncio.run(call()) == (200, 200, True)
+    assert loop_threads == [False]
+
+
+@pytest.mark.parametrize("portfolio", [RuntimeError("Модель оценки риска не загружена"), {"stocks": [], "bonds": []}])
+def test_generate_portfolio_matches(clients, monkeypatch, portfolio):
+    from ml import portfolio_engine
+    from models.async_models import AsyncDraftCollection, AsyncUserAnswer
+    from models.draft_collection_model import DraftCollection
+    from services.user_answer_service import UserAnswerService
+
+    def generate(user_answers):
+        if isinstance(portfolio, Exception):
+            raise portfolio
+        return portfolio
+
+    async def get_answers(login):
+        return {"q1": 1}
+
+    async def save_draft(login, data):
+        return None
+
+    monkeypatch.setattr(portfolio_engine, "generate_portfolio", generate)
+    monkeypatch.setattr(UserAnswerService, "get_answers", staticmethod(lambda login: {"q1": 1}))
+    monkeypatch.setattr(DraftCollection, "save_draft", staticmethod(lambda login, data: None))
+    monkeypatch.setattr(AsyncUserAnswer, "get_answers", staticmethod(get_answers))
+    monkeypatch.setattr(AsyncDraftCollection, "save_draft", staticmethod(save_draft))
+
+    flask_client, quart_client = clients
+    body = {"login": "bob", "market_data": {"x": 1}}
+    expected = flask_client.post("/api/ml/generate_portfolio", json=body)
+
+    async def call():
+        response = await quart_client.post("/api/ml/generate_portfolio", json=body)
+        return response.status_code, await response.get_json()
+
+    assert asyncio.run(call()) == (expected.status_code, expected.get_json())
+    assert expected.status_code == (500 if isinstance(portfolio, Exception) else 200)
@@ -0,0 +1,46 @@
+import mongomock
+import pytest
+
+from models import collection_model
+from models.collection_model import Collection
+
+UNIVERSE = {
+    "SBER": {"ticker": "SBER", "name": "Сбербанк", "price": 300.0},
+    "SU26238": {"ticker": "SU26238", "name": "ОФЗ 26238", "price": 58.4},
+}
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    inserted = []
+    monkeypatch.setattr(collection_model, "collections_collection", mongomock.MongoClient().db["collections"])
+    monkeypatch.setattr(
+        collection_model.Security, "insert_missing",
+        staticmethod(lambda securities, snapshot_version=None: inserted.extend(securities))
+    )
+    return inserted
+
+
+def collection(stocks, bonds):
+    return {"user_login": "bob", "name": "c", "goal": "g", "expected_return": 1, "stocks": stocks, "bonds": bonds}
+
+
+def test_client_security_data_never_reaches_shared_table(stored):
+    forged = {"ticker": "SBER", "name": "Подделка", "price": 1.0, "dividend": 99}
+    collection_id = Collection.create_collection(
+        collection([forged], [{"ticker": "SU26238", "price": 60.0}]), 7, UNIVERSE
+    )
+
+    assert stored == [UNIVERSE["SBER"], UNIVERSE["SU26238"]]
+    saved = Collection.get_collection_by_id(str(collection_id))
+    assert saved["stocks"] == [{"ticker": "SBER", "price": 1.0, "weight": round(1.0 / 61.0, 6)}]
+
+
+def test_unknown_tickers_are_kept_as_unresolved_refs(stored):
+    collection_id = Collection.create_collection(
+        collection([{"ticker": "FAKE", "price": 10.0, "name": "Не из снимка"}], []), 7, UNIVERSE
+    )
+
+    assert stored == []
+    saved = Collection.get_collection_by_id(str(collection_id))
+    assert saved["stocks"] == [{"ticker": "FAKE", "price": 10.0, "weight": 1.0, "unresolved": True}]
@@ -0,0 +1,152 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from ml import fetcher
+
+LATENCY = 0.1
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    hits = {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            hits = self.hits[self.path] = self.hits.get(self.path, 0) + 1
+
+        if self.path.startswith("/slow"):
+            time.sleep(LATENCY)
+        if self.path == "/flaky" and hits <= 2:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = self.path.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    # Очередь по умолчанию — 5 соединений: при 16 потоках часть SYN теряется и ждёт повтора целую секунду
+    request_queue_size = 64
+
+
+@pytest.fixture
+def stub_server():
+    StubHandler.hits = {}
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def rate_limits(monkeypatch):
+    monkeypatch.setattr(fetcher, "_limiters", {})
+
+    def set_limit(rate):
+        monkeypatch.setitem(fetcher.HOST_RATE_LIMITS, "127.0.0.1", rate)
+    return set_limit
+
+
+def fetch_text(url):
+    response = fetcher.get(url)
+    response.raise_for_status()
+    return response.text
+
+
+def test_fetch_many_is_faster_than_sequential(stub_server, rate_limits):
+    rate_limits(1000)
+    urls = [f"{stub_server}/slow/{i}" for i in range(20)]
+
+    started = time.monotonic()
+    sequential = [fetch_text(url) for url in urls]
+    sequential_time = time.monotonic() - started
+
+    started = time.monotonic()
+    parallel = fetcher.fetch_many(fetch_text, urls)
+    parallel_time = time.monotonic() - started
+
+    assert [result for _, result, _ in parallel] == sequential
+    assert all(error is None for _, _, error in parallel)
+    assert sequential_time >= len(urls) * LATENCY
+    assert parallel_time < sequential_time / 4
+
+
+def test_iter_many_keeps_order_and_reports_errors(stub_server, rate_limits):
+    rate_limits(1000)
+
+    def fetch(i):
+        if i == 3:
+            raise ValueError("boom")
+        return fetch_text(f"{stub_server}/item/{i}")
+
+    results = list(fetcher.iter_many(fetch, range(6), max_workers=2))
+
+    assert [item for item, _, _ in results] == list(range(6))
+    assert isinstance(results[3][2], ValueError)
+    assert results[5][1] == "/item/5"
+
+
+def test_per_host_rate_limit(stub_server, rate_limits):
+    rate = 10
+    rate_limits(rate)
+    urls = [f"{stub_server}/fast/{i}" for i in range(rate + 1)]
+
+    started = time.monotonic()
+    results = fetcher.fetch_many(fetch_text, urls)
+    elapsed = time.monotonic() - started
+
+    assert all(error is None for _, _, error in results)
+    # 11 запросов при 10 в секунду: последний не раньше чем через секунду после первого
+    assert elapsed >= (len(urls) - 1) / rate * 0.95
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(fetcher, "BACKOFF_FACTOR", 0)
+
+
+def test_retries_on_503(stub_server, rate_limits, no_backoff):
+    rate_limits(1000)
+
+    response = fetcher.get(f"{stub_server}/flaky")
+
+    assert response.status_code == 200
+    assert StubHandler.hits["/flaky"] == 3
+
+
+def test_retries_go_through_the_rate_limit(stub_server, rate_limits, no_backoff):
+    rate = 5
+    rate_limits(rate)
+
+    started = time.monotonic()
+    response = fetcher.get(f"{stub_server}/flaky")
+    elapsed = time.monotonic() - started
+
+    assert response.status_code == 200
+    # Три попытки при 5 в секунду: повторы не обходят ограничитель хоста
+    assert elapsed >= 2 / rate * 0.95
+
+
+def test_gives_up_after_retries(stub_server, rate_limits, no_backoff, monkeypatch):
+    rate_limits(1000)
+    monkeypatch.setattr(fetcher, "RETRIES", 1)
+
+    response = fetcher.get(f"{stub_server}/flaky")
+
+    assert response.status_code == 503
+    assert StubHandler.hits["/flaky"] == 2
@@ -0,0 +1,88 @@
+import os
+import re
+
+import pytest
+from bs4 import BeautifulSoup
+
+from ml import html_extract
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def extract(text, pattern, cast=float, spaces=False):
+    match = re.search(pattern, text)
+    if match:
+        value = match.group(1).replace(',', '.')
+        try:
+            return cast(value.replace(' ', '') if spaces else value)
+        except ValueError:
+            return None
+    return None
+
+
+def soup_smart_lab(html):
+    # Прежний разбор через BeautifulSoup и get_text() — эталон для сравнения
+    text = BeautifulSoup(html, 'html.parser').get_text()
+    name_match = re.search(r"Имя облигации\s*(.*?)\s", text)
+    frequency = extract(text, r"Частота купона, раз в год\s*([\d,.]+)")
+    return {
+        'name': name_match.group(1).strip() if name_match else None,
+        'maturity_date': extract(text, r"Дата погашения\s*(\d{2}-\d{2}-\d{4})", str),
+        'coupon_size': extract(text, r"Купон, руб \(\?\)\s*([\d,.]+)"),
+        'coupon_frequency': round(frequency) if frequency is not None else None,
+        'yield': extract(text, r"Доходность\* облигации к погашению составляет\s*([\d,.]+)"),
+        'price': extract(text, r"Облигация .*? стоит сейчас\s*([\d,.]+)")
+    }
+
+
+def soup_bcs(html):
+    text = BeautifulSoup(html, 'html.parser').get_text(" ", strip=True)
+    return {
+        'price': extract(text, r"Стоимость\s+[A-Z]+\s+на\s+\d{2}\.\d{2}\.\d{4}\s*—\s*([\d\s,.]+)", spaces=True),
+        'dividend': extract(text, r"Дивиденды\s+([\d\s,.]+)", spaces=True),
+        'high': extract(text, r"максимальная цена\s*—\s*([\d\s,.]+)", spaces=True),
+        'low': extract(text, r"минимальная цена\s*—\s*([\d\s,.]+)", spaces=True)
+    }
+
+
+@pytest.mark.parametrize("name", ["smart_lab_bond.html", "smart_lab_bond_plain.html"])
+def test_smart_lab_matches_soup(name):
+    html = fixture(name)
+    fields = html_extract.parse_smart_lab(html)
+    assert fields == soup_smart_lab(html)
+    assert None not in fields.values()
+
+
+def test_smart_lab_fields():
+    assert html_extract.parse_smart_lab(fixture("smart_lab_bond.html")) == {
+        'name': "ОФЗ",
+        'maturity_date': "15-05-2041",
+        'coupon_size': 35.4,
+        'coupon_frequency': 2,
+        'yield': 14.87,
+        'price': 58.42
+    }
+
+
+def test_bcs_matches_soup():
+    html = fixture("bcs_stock.html")
+    assert html_extract.parse_bcs(html) == soup_bcs(html) == {
+        'price': 312.45, 'dividend': 33.3, 'high': 315.1, 'low': 309.8
+    }
+
+
+def test_blocks_exclude_page_chrome():
+    text = html_extract.block_text(fixture("smart_lab_bond.html"), html_extract.SMART_LAB_BLOCKS)
+    assert "Имя облигации" in text
+    assert "Новость" not in text and "ФЕЙК" not in text
+
+
+def test_missing_fields_stay_none():
+    assert html_extract.parse_bcs("<html><body><p>Нет данных</p></body></html>") == {
+        'price': None, 'dividend': None, 'high': None, 'low': None
+    }
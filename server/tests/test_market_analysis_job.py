@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+
+import pytest
+
+from services import market_analysis_job
+from services.market_analysis_job import MarketAnalysisJob
+
+
+def child_analysis(full, lease_lost):
+    # Возвращает то, что видно из процесса анализа
+    return {"pid": os.getpid(), "full": full, "lease_lost": lease_lost.is_set()}
+
+
+def failing_analysis(full, lease_lost):
+    raise ValueError("MOEX недоступна")
+
+
+def crashing_analysis(full, lease_lost):
+    os._exit(3)
+
+
+@pytest.fixture
+def job(monkeypatch):
+    monkeypatch.setattr(market_analysis_job.JobLock, "acquire", staticmethod(lambda *args: True))
+    monkeypatch.setattr(market_analysis_job.JobLock, "release", staticmethod(lambda *args: None))
+    monkeypatch.setattr(market_analysis_job.JobLock, "get", staticmethod(lambda *args: None))
+    completed = []
+    job = MarketAnalysisJob(on_complete=lambda: completed.append(True))
+    job._running.acquire()
+    job.completed = completed
+    yield job
+    job.shutdown()
+
+
+def test_analysis_runs_in_a_spawned_process(job):
+    job.analysis = child_analysis
+    job._run(True)
+
+    result = job.status()["last_version"]
+    assert result["pid"] != os.getpid()
+    assert result == {"pid": result["pid"], "full": True, "lease_lost": False}
+    assert job.completed == [True]
+
+
+@pytest.mark.parametrize("analysis, error", [
+    (failing_analysis, "MOEX недоступна"),
+    (crashing_analysis, "Процесс анализа завершился с кодом 3"),
+])
+def test_child_failures_are_recorded(job, analysis, error):
+    job.analysis = analysis
+    job._run(False)
+
+    status = job.status()
+    assert status["failures"] == 1
+    assert status["last_error"] == error
+    assert job.completed == []
+
+
+def test_web_process_does_not_need_torch():
+    import subprocess
+    code = "import sys, wsgi, services.scheduler; sys.exit('torch' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True).returncode == 0
+
+
+def analysis_with_slow_revalidation(full, lease_lost):
+    from ml import security_cache
+    for i in range(8):
+        security_cache._revalidate(f"T{i}", "bcs", lambda ticker: time.sleep(5))
+    return 1
+
+
+def test_pending_revalidation_does_not_delay_the_run(job):
+    job.analysis = analysis_with_slow_revalidation
+    started = time.monotonic()
+    job._run(False)
+
+    assert job.status()["last_version"] == 1
+    assert time.monotonic() - started < 4
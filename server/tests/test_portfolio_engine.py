@@ -0,0 +1,67 @@
+import pytest
+
+from ml import portfolio_engine, risk_table
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    portfolio_engine._evaluate.cache_clear()
+    yield monkeypatch
+    portfolio_engine._evaluate.cache_clear()
+
+
+def test_table_mode_bypasses_the_cache(engine):
+    engine.setattr(portfolio_engine, "_table", risk_table.RiskTable(i % 3 for i in range(risk_table.SIZE)))
+
+    assert portfolio_engine._risk_level((0, 0, 0, 0, 2)) == 2
+    assert portfolio_engine.cache_info()["currsize"] == 0
+
+
+def test_model_mode_is_keyed_by_model_and_snapshot_version(engine):
+    main1 = pytest.importorskip("ml.main1")
+    calls = []
+    engine.setattr(main1, "evaluate_risk_level", lambda model, user_input: calls.append(user_input) or 1)
+    engine.setattr(portfolio_engine, "_table", None)
+    engine.setattr(portfolio_engine, "_model_version", "m1")
+    engine.setattr(portfolio_engine, "_universe_version", 1)
+
+    for _ in range(3):
+        assert portfolio_engine._risk_level((1, 2, 3, 4, 5)) == 1
+    engine.setattr(portfolio_engine, "_universe_version", 2)
+    portfolio_engine._risk_level((1, 2, 3, 4, 5))
+
+    assert len(calls) == 2
+
+
+def packaged_meta(**changes):
+    meta = dict(portfolio_engine.load_meta(portfolio_engine.MODEL_NAME, portfolio_engine.INPUT_SCHEMA))
+    meta.update(changes)
+    return lambda *args: meta
+
+
+def test_corrupt_table_is_an_artifact_error(engine):
+    engine.setattr(portfolio_engine.Config, "RISK_EVALUATION_MODE", "table")
+    engine.setattr(portfolio_engine, "load_meta", packaged_meta(lookup_table="9" * risk_table.SIZE))
+
+    with pytest.raises(portfolio_engine.ArtifactError):
+        portfolio_engine.load_model()
+
+
+def test_artifact_without_table_is_built_in_one_pass(engine):
+    main1 = pytest.importorskip("ml.main1")
+    expected = packaged_meta()()["lookup_table"]
+    batches = []
+    evaluate_risk_levels = main1.evaluate_risk_levels
+    engine.setattr(main1, "evaluate_risk_levels", lambda model, inputs: batches.append(len(inputs))
+                   or evaluate_risk_levels(model, inputs))
+    engine.setattr(main1, "evaluate_risk_level", lambda model, user_input: pytest.fail("прогон по одному входу"))
+    engine.setattr(portfolio_engine.Config, "RISK_EVALUATION_MODE", "table")
+    engine.setattr(portfolio_engine, "load_meta", packaged_meta(lookup_table=None))
+    for name in ("_model", "_table", "_model_version"):
+        engine.setattr(portfolio_engine, name, getattr(portfolio_engine, name))
+
+    portfolio_engine.load_model()
+
+    assert batches == [risk_table.SIZE]
+    assert portfolio_engine._model is None
+    assert portfolio_engine._table.dumps() == expected
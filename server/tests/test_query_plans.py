@@ -0,0 +1,274 @@
+import os
+import uuid
+from datetime import datetime
+
+import mongomock
+import pytest
+from bson import ObjectId
+from pymongo import ASCENDING, MongoClient
+from pymongo.errors import PyMongoError
+
+import database
+from models import (
+    collection_model, draft_collection_model, job_lock_model, risk_assessment_model, security_cache_model,
+    security_model, user_answer_model, user_model
+)
+from models.collection_model import Collection
+from models.draft_collection_model import DraftCollection
+from models.job_lock_model import JobLock
+from models.risk_assessment_model import RiskAssessment
+from models.security_cache_model import SecurityCache
+from models.security_model import Security
+from models.user_answer_model import UserAnswer
+from models.user_model import User
+from services import user_service
+from services.user_service import UserService
+
+# Запросы, которым индекс не нужен: в risk_assessment не больше RETAINED_VERSIONS + 1 документов,
+# а пустой фильтр — чтение старого снимка без версии и полная очистка кэша
+ALLOWED_SCANS = {("risk_assessment", "delete_many"), ("risk_assessment", "find_one"), ("security_cache", "delete_many")}
+
+COLLECTIONS = {
+    "users_collection": "users",
+    "collections_collection": "collections",
+    "user_answers_collection": "user_answers",
+    "draft_collections_collection": "draft_collections",
+    "risk_assessment_collection": "risk_assessment",
+    "risk_assessment_meta_collection": "risk_assessment_meta",
+    "securities_collection": "securities",
+    "job_locks_collection": "job_locks",
+    "security_cache_collection": "security_cache",
+}
+MODULES = (
+    database, user_model, user_service, collection_model, draft_collection_model, user_answer_model,
+    risk_assessment_model, security_model, job_lock_model, security_cache_model
+)
+
+
+class RecordingCursor:
+    def __init__(self, cursor, entry):
+        self._cursor = cursor
+        self._entry = entry
+
+    def sort(self, key, direction=None):
+        self._entry["sort"] = key if isinstance(key, list) else [(key, direction or ASCENDING)]
+        self._cursor = self._cursor.sort(self._entry["sort"])
+        return self
+
+    def limit(self, limit):
+        self._cursor = self._cursor.limit(limit)
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+class RecordingCollection:
+    def __init__(self, collection, log):
+        self._collection = collection
+        self._log = log
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+    def _record(self, op, query, sort=None):
+        entry = {"collection": self._collection.name, "op": op, "filter": query or {}, "sort": sort}
+        self._log.append(entry)
+        return entry
+
+    def find(self, query=None, projection=None, *args, **kwargs):
+        entry = self._record("find", query)
+        if isinstance(self._collection, mongomock.Collection):
+            # mongomock не поддерживает $size в проекции, а для плана запроса проекция не важна
+            projection = None
+        return RecordingCursor(self._collection.find(query, projection, *args, **kwargs), entry)
+
+    def find_one(self, query=None, *args, **kwargs):
+        self._record("find_one", query)
+        return self._collection.find_one(query, *args, **kwargs)
+
+    def find_one_and_update(self, query, *args, **kwargs):
+        self._record("find_one_and_update", query)
+        return self._collection.find_one_and_update(query, *args, **kwargs)
+
+    def update_one(self, query, *args, **kwargs):
+        self._record("update_one", query)
+        return self._collection.update_one(query, *args, **kwargs)
+
+    def delete_one(self, query, *args, **kwargs):
+        self._record("delete_one", query)
+        return self._collection.delete_one(query, *args, **kwargs)
+
+    def delete_many(self, query, *args, **kwargs):
+        self._record("delete_many", query)
+        return self._collection.delete_many(query, *args, **kwargs)
+
+    def bulk_write(self, operations, *args, **kwargs):
+        for operation in operations:
+            self._record("bulk_write", operation._filter)
+        if isinstance(self._collection, mongomock.Collection):
+            # UpdateOne из pymongo 4 несовместим с bulk_write в mongomock
+            for operation in operations:
+                self._collection.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+            return None
+        return self._collection.bulk_write(operations, *args, **kwargs)
+
+
+def bind(monkeypatch, db):
+    log = []
+    for attribute, name in COLLECTIONS.items():
+        collection = RecordingCollection(db[name], log)
+        for module in MODULES:
+            if hasattr(module, attribute):
+                monkeypatch.setattr(module, attribute, collection)
+    monkeypatch.setattr(user_model.PasswordService, "hash_password", staticmethod(lambda password: "hash"))
+    return log
+
+
+def exercise_models():
+    UserService.register_user({"login": "bob", "email": "b@x", "phone": "1", "password": "p", "birthdate": "2000-01-01"})
+    User.get_user_by_login("bob")
+    User.update_user("bob", {"email": "c@x"})
+    User.set_password_hash("bob", "hash2")
+
+    collection_id = collections_insert("bob")
+    Collection.get_collections_by_user("bob")
+    page = list(Collection.find_summaries("bob", 2))
+    list(Collection.find_summaries("bob", 2, (page[-1]["creation_date"], page[-1]["_id"])))
+    Collection.get_collection_by_id(str(collection_id))
+    Collection.delete_collection(str(collection_id))
+
+    UserAnswer.save_answers("bob", {"q1": 1})
+    UserAnswer.get_answers("bob")
+    DraftCollection.save_draft("bob", {"stocks": []})
+    DraftCollection.get_draft("bob")
+    DraftCollection.delete_draft("bob")
+
+    version = RiskAssessment.save({"securities": {}})
+    RiskAssessment.get(version)
+    RiskAssessment.list_versions()
+
+    Security.upsert_many({"SBER": {"ticker": "SBER"}}, version)
+    Security.get_many(["SBER"])
+
+    JobLock.acquire("analysis", "me", 60)
+    JobLock.renew("analysis", "me", 60)
+    JobLock.get("analysis")
+    JobLock.release("analysis", "me")
+
+    SecurityCache.save("SBER", "moex", {"price": 1.0}, datetime.utcnow())
+    SecurityCache.get("SBER", "moex")
+    SecurityCache.invalidate(["SBER"])
+
+    User.delete_user("bob")
+
+
+def collections_insert(login):
+    ids = [ObjectId() for _ in range(3)]
+    for i, collection_id in enumerate(ids):
+        database.collections_collection.insert_one({
+            "_id": collection_id, "user_login": login, "name": f"c{i}", "creation_date": datetime(2026, 1, i + 1),
+            "goal": "", "expected_return": 1, "risk_category": "Low", "deadline": None, "stocks": [], "bonds": []
+        })
+    return ids[0]
+
+
+def index_keys(collection):
+    return [["_id"]] + [list(index.document["key"]) for index in database.INDEXES.get(collection, [])]
+
+
+def served_by_index(entry):
+    fields = [field for field in entry["filter"] if not field.startswith("$")]
+    sort = [field for field, _ in entry["sort"] or [] if field not in fields]
+    for keys in index_keys(entry["collection"]):
+        prefix = keys[:len(fields)]
+        if fields and set(prefix) <= set(fields) and keys[0] in fields and keys[len(prefix):len(prefix) + len(sort)] == sort:
+            return True
+        if not fields and sort and keys[:len(sort)] == sort:
+            return True
+    return False
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    db = mongomock.MongoClient().db
+    for name, indexes in database.INDEXES.items():
+        db[name].create_indexes(indexes)
+    log = bind(monkeypatch, db)
+    exercise_models()
+    return log
+
+
+def test_every_model_query_has_an_index(recorded):
+    assert {entry["collection"] for entry in recorded} >= {
+        "users", "collections", "user_answers", "draft_collections", "risk_assessment", "securities"
+    }
+    unindexed = [
+        entry for entry in recorded
+        if not served_by_index(entry) and (entry["collection"], entry["op"]) not in ALLOWED_SCANS
+        and entry["collection"] != "risk_assessment_meta"
+    ]
+    assert unindexed == []
+
+
+def test_collection_queries_sort_by_the_index(recorded):
+    summaries = [entry for entry in recorded if entry["collection"] == "collections" and entry["sort"]]
+    assert len(summaries) == 2
+    assert all(entry["sort"] == collection_model.SUMMARY_SORT for entry in summaries)
+    assert {"op": "delete_many", "filter": {"user_login": "bob"}} in [
+        {"op": entry["op"], "filter": entry["filter"]} for entry in recorded if entry["collection"] == "collections"
+    ]
+
+
+def plan_stages(plan):
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append((plan["stage"], plan.get("indexName")))
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
+
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    # explain() требует настоящего mongod: MONGO_TEST_URI=mongodb://localhost:27017 pytest tests
+    uri = os.getenv("MONGO_TEST_URI")
+    if not uri:
+        pytest.skip("MONGO_TEST_URI не задан")
+    client = MongoClient(uri, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError as e:
+        pytest.skip(f"MongoDB недоступна: {e}")
+
+    name = f"investment_app_test_{uuid.uuid4().hex[:8]}"
+    db = client[name]
+    for collection, indexes in database.INDEXES.items():
+        db[collection].create_indexes(indexes)
+    yield db
+    client.drop_database(name)
+    client.close()
+
+
+def test_explain_uses_indexes(mongo_db, monkeypatch):
+    log = bind(monkeypatch, mongo_db)
+    exercise_models()
+    collections_insert("bob")
+
+    for entry in log:
+        if (entry["collection"], entry["op"]) in ALLOWED_SCANS or entry["collection"] == "risk_assessment_meta":
+            continue
+        cursor = mongo_db[entry["collection"]].find(entry["filter"])
+        if entry["sort"]:
+            cursor = cursor.sort(entry["sort"])
+        stages = plan_stages(cursor.explain()["queryPlanner"]["winningPlan"])
+        names = {stage for stage, _ in stages}
+
+        assert "COLLSCAN" not in names, entry
+        assert names & {"IXSCAN", "IDHACK", "EXPRESS_IXSCAN", "EXPRESS_IDHACK", "CLUSTERED_IXSCAN"}, entry
+        if entry["sort"]:
+            assert "SORT" not in names, entry
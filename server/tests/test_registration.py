@@ -0,0 +1,64 @@
+import asyncio
+
+import mongomock
+import pytest
+
+import database
+from models import async_models, user_model
+from routes import asgi_user_routes
+from services import user_service
+from services.user_service import UserService
+
+USER = {"login": "bob", "email": "b@x", "phone": "1", "password": "secret", "birthdate": "2000-01-01"}
+EXISTS = ({"error": "Пользователь с таким логином уже существует"}, 400)
+
+
+class AsyncCollection:
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def insert_one(self, document):
+        return self.collection.insert_one(document)
+
+    async def find_one(self, query):
+        # Проверка до вставки пропускает оба запроса, как при одновременной регистрации
+        return None
+
+
+@pytest.fixture
+def users(monkeypatch):
+    collection = mongomock.MongoClient().db["users"]
+    collection.create_indexes(database.INDEXES["users"])
+    monkeypatch.setattr(user_model, "users_collection", collection)
+    monkeypatch.setattr(user_service, "users_collection", mongomock.MongoClient().db["users"])
+    monkeypatch.setattr(user_model.PasswordService, "hash_password", staticmethod(lambda password: "hash"))
+    monkeypatch.setattr(async_models, "get_async_db", lambda: {"users": AsyncCollection(collection)})
+
+    async def hash_password(password):
+        return "hash"
+
+    monkeypatch.setattr(asgi_user_routes, "hash_password", hash_password)
+    return collection
+
+
+def test_concurrent_registration_returns_existing_error(users):
+    assert UserService.register_user(dict(USER)) == ({"message": "Пользователь зарегистрирован успешно"}, 201)
+    assert UserService.register_user(dict(USER)) == EXISTS
+    assert users.count_documents({"login": "bob"}) == 1
+
+
+def test_concurrent_registration_in_asgi_mode(users):
+    import asgi
+    client = asgi.create_app(start_jobs=False).test_client()
+
+    async def register():
+        response = await client.post("/api/users/register", json=USER)
+        return await response.get_json(), response.status_code
+
+    async def both():
+        return await register(), await register()
+
+    first, second = asyncio.run(both())
+    assert first[1] == 201
+    assert second == EXISTS
+    assert users.count_documents({"login": "bob"}) == 1
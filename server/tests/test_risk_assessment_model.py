@@ -0,0 +1,34 @@
+import mongomock
+import pytest
+
+from models import risk_assessment_model
+from models.risk_assessment_model import RETAINED_VERSIONS, RiskAssessment
+
+
+@pytest.fixture(autouse=True)
+def collections(monkeypatch):
+    db = mongomock.MongoClient().db
+    monkeypatch.setattr(risk_assessment_model, "risk_assessment_collection", db["risk_assessment"])
+    monkeypatch.setattr(risk_assessment_model, "risk_assessment_meta_collection", db["risk_assessment_meta"])
+    return db
+
+
+def test_partials_do_not_evict_full_versions():
+    full = [RiskAssessment.save({"n": i}) for i in range(RETAINED_VERSIONS)]
+    for i in range(3 * RETAINED_VERSIONS):
+        partial = RiskAssessment.save({"n": i}, partial=True)
+
+    versions = RiskAssessment.list_versions()
+    assert [v["version"] for v in versions if not v["partial"]] == full[::-1]
+    assert [v["version"] for v in versions if v["partial"]] == [partial]
+    assert RiskAssessment.current_version() == partial
+
+
+def test_full_save_drops_partials_and_keeps_retention():
+    RiskAssessment.save({"n": 0}, partial=True)
+    RiskAssessment.save({"n": 1}, partial=True)
+    full = [RiskAssessment.save({"n": i}) for i in range(RETAINED_VERSIONS + 2)]
+
+    versions = RiskAssessment.list_versions()
+    assert [v["version"] for v in versions] == full[:-RETAINED_VERSIONS - 1:-1]
+    assert RiskAssessment.get()["n"] == RETAINED_VERSIONS + 1
@@ -0,0 +1,76 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from ml import risk_table
+from ml.artifacts import load_artifact, load_meta
+from ml.main1 import RiskEvaluationNN, evaluate_risk_levels
+from ml.portfolio import INPUT_SCHEMA, MODEL_NAME
+
+
+def packaged_model():
+    meta = load_meta(MODEL_NAME, INPUT_SCHEMA)
+    _, state_dict = load_artifact(MODEL_NAME, INPUT_SCHEMA, meta["version"])
+    model = RiskEvaluationNN()
+    model.load_state_dict(state_dict)
+    model.eval()
+    return model, meta
+
+
+def test_packaged_table_matches_batched_forward_pass():
+    model, meta = packaged_model()
+
+    inputs = torch.tensor(list(risk_table.all_inputs()), dtype=torch.float32)
+    with torch.no_grad():
+        levels = model(inputs).reshape(-1).round().clamp(0, 2).to(torch.uint8)
+
+    assert len(levels) == risk_table.SIZE
+    assert bytes(levels.tolist()) == risk_table.RiskTable.loads(meta["lookup_table"]).levels
+
+
+def test_lookup_uses_answer_order():
+    table = risk_table.RiskTable(i % 3 for i in range(risk_table.SIZE))
+    assert table.lookup([0, 0, 0, 0, 1]) == 1
+    assert table.lookup([1, 0, 0, 0, 0]) == risk_table.GRADES ** 4 % 3
+    with pytest.raises(ValueError):
+        table.lookup([6, 0, 0, 0, 0])
+
+
+def test_build_runs_a_single_batched_pass():
+    model, meta = packaged_model()
+    calls = []
+
+    def evaluate_many(inputs):
+        calls.append(len(inputs))
+        return evaluate_risk_levels(model, inputs)
+
+    table = risk_table.build(evaluate_many)
+    assert calls == [risk_table.SIZE]
+    assert table.dumps() == meta["lookup_table"]
+
+
+def test_verify_rejects_mismatch():
+    inputs = list(risk_table.all_inputs())
+    levels = [0] * risk_table.SIZE
+    table = risk_table.RiskTable(levels)
+    levels[7] = 1
+    with pytest.raises(ValueError):
+        risk_table.verify(table, inputs, levels)
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "0" * (risk_table.SIZE - 1),
+    "0" * (risk_table.SIZE + 1),
+    "3" + "0" * (risk_table.SIZE - 1),
+    "0" * (risk_table.SIZE - 1) + "9",
+    "-" + "0" * (risk_table.SIZE - 1),
+])
+def test_loads_rejects_malformed_text(text):
+    with pytest.raises(ValueError):
+        risk_table.RiskTable.loads(text)
+
+
+def test_levels_out_of_range_are_rejected():
+    with pytest.raises(ValueError):
+        risk_table.RiskTable([3] * risk_table.SIZE)
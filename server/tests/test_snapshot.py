@@ -0,0 +1,36 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from ml import snapshot
+
+
+def make_snapshot(n):
+    builder = snapshot.SnapshotBuilder()
+    for i in range(n):
+        builder.add("Stocks", {"ticker": f"T{i}", "price": float(i)}, i % 3)
+    return builder.build(version=n)
+
+
+def test_concurrent_writers_never_leave_torn_file(tmp_path):
+    path = str(tmp_path / "risk_assessment.json")
+    sizes = [50, 500, 5000] * 8
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda n: snapshot.write(path, make_snapshot(n)), sizes))
+
+    data = snapshot.load(path)
+    assert len(data["securities"]) in set(sizes)
+    assert os.listdir(tmp_path) == ["risk_assessment.json"]
+
+
+def test_failed_write_keeps_previous_file(tmp_path):
+    path = str(tmp_path / "risk_assessment.json")
+    snapshot.write(path, make_snapshot(3))
+
+    try:
+        snapshot.write(path, {"bad": object()})
+    except TypeError:
+        pass
+
+    assert len(snapshot.load(path)["securities"]) == 3
+    assert os.listdir(tmp_path) == ["risk_assessment.json"]
@@ -0,0 +1,90 @@
+import itertools
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ml.ytm import DEFAULT_FACE_VALUE, HIGH_RATE, solve_ytm
+
+
+def bisection_ytm(C, f, P, years, N=DEFAULT_FACE_VALUE, accrued=0.0, min_periods=0):
+    # Прежний расчёт из get_bond_data: перебор купонов и деление отрезка пополам
+    n = max(int(f * years), min_periods)
+    dirty_price = P + accrued
+
+    def ytm_objective(r):
+        return sum(C / (1 + r / f) ** i for i in range(1, n + 1)) + N / (1 + r / f) ** n - dirty_price
+
+    low, high = 0.0001, 1.0
+    for _ in range(100):
+        mid = (low + high) / 2
+        value = ytm_objective(mid)
+        if abs(value) < 1e-4:
+            break
+        if value > 0:
+            low = mid
+        else:
+            high = mid
+    return mid
+
+
+# Случаи с n = 0 разобраны отдельно в test_less_than_one_period_counts_as_one
+CASES = [
+    case for case in itertools.product(
+        (5.0, 24.93, 48.87),
+        (1, 2, 4, 12),
+        (800.0, 950.0, 1000.0, 1080.0),
+        (0.6, 1.5, 3.2, 7.0, 15.4)
+    )
+    if int(case[1] * case[3]) >= 1
+]
+
+
+@pytest.mark.parametrize("coupon, frequency, price, years", CASES)
+def test_matches_bisection(coupon, frequency, price, years):
+    expected = bisection_ytm(coupon, frequency, price, years)
+    actual = float(solve_ytm(coupon, frequency, price, years)[()])
+
+    assert actual == pytest.approx(expected, abs=1e-6)
+    assert round(actual * 100, 2) == round(expected * 100, 2)
+
+
+def test_batched_matches_scalar():
+    coupon, frequency, price, years = (np.array(column, dtype=float) for column in zip(*CASES))
+    batched = solve_ytm(coupon, frequency, price, years)
+
+    for i, case in enumerate(CASES):
+        assert batched[i] == pytest.approx(float(solve_ytm(*case)[()]), abs=1e-9)
+
+
+@pytest.mark.parametrize("face", [100.0, 500.0, 1000.0, 10000.0])
+def test_non_default_face_value(face):
+    coupon, frequency, years = face * 0.04, 2, 4.0
+    price = face * 0.93
+
+    expected = bisection_ytm(coupon, frequency, price, years, N=face)
+    assert float(solve_ytm(coupon, frequency, price, years, face=face)[()]) == pytest.approx(expected, abs=1e-6)
+
+
+@pytest.mark.parametrize("accrued", [0.0, 3.5, 17.2])
+def test_accrued_interest_uses_dirty_price(accrued):
+    expected = bisection_ytm(35.0, 2, 960.0, 5.0, accrued=accrued)
+    actual = float(solve_ytm(35.0, 2, 960.0, 5.0, accrued=accrued)[()])
+
+    assert actual == pytest.approx(expected, abs=1e-6)
+    if accrued:
+        assert actual < float(solve_ytm(35.0, 2, 960.0, 5.0)[()])
+
+
+def test_less_than_one_period_counts_as_one():
+    # Прежний код при n = 0 не зависел от ставки и уходил на границу отрезка;
+    # теперь до погашения всегда остаётся как минимум один купон
+    coupon, frequency, price, years = 40.0, 2, 990.0, 0.1
+
+    old = bisection_ytm(coupon, frequency, price, years)
+    expected = bisection_ytm(coupon, frequency, price, years, min_periods=1)
+    actual = float(solve_ytm(coupon, frequency, price, years)[()])
+
+    assert old == pytest.approx(HIGH_RATE, abs=1e-6)
+    assert actual == pytest.approx(expected, abs=1e-6)
+    assert actual < HIGH_RATE / 2